@@ -3,48 +3,177 @@ Hybrid ECC-AES192 Web Application
 Flask backend for secure key exchange and file encryption
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash
+from flask import Blueprint, Flask, current_app, render_template, request, jsonify, send_file, redirect, url_for, flash, g
+from functools import wraps
+import atexit
 import os
 import json
+import threading
 import time
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 import tempfile
 import shutil
 
-from crypto_modules import ECCManager, ECDHManager, AESManager
+# crypto_modules is imported lazily by CryptoComponents so that importing
+# this module and creating the app do not pull in the cryptography stack
 
-app = Flask(__name__)
-app.secret_key = 'hybrid-ecc-aes192-secret-key-2023'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['KEYS_FOLDER'] = 'keys'
-app.config['ENCRYPTED_FOLDER'] = 'encrypted'
-
-# Create necessary directories
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(app.config['KEYS_FOLDER'], exist_ok=True)
-os.makedirs(app.config['ENCRYPTED_FOLDER'], exist_ok=True)
-
-# Initialize crypto managers
-ecc_manager = ECCManager()
-ecdh_manager = ECDHManager()
-aes_manager = AESManager()
+bp = Blueprint('main', __name__)
 
 # Global variables to store session data (in production, use proper session management)
 session_data = {
     'alice_keys': None,
     'bob_keys': None,
     'shared_secret_info': None,
-    'performance_logs': []
+    'session_keys': {}
 }
 
-@app.route('/')
+class CryptoComponents:
+    """Managers used by the routes, each constructed on first use"""
+    
+    def __init__(self, config):
+        self.config = config
+        self._instances = {}
+        self._lock = threading.Lock()
+    
+    def _get(self, name, factory):
+        try:
+            return self._instances[name]
+        except KeyError:
+            with self._lock:
+                if name not in self._instances:
+                    self._instances[name] = factory()
+                return self._instances[name]
+    
+    @property
+    def ecc_manager(self):
+        from crypto_modules import ECCManager
+        return self._get('ecc_manager', ECCManager)
+    
+    @property
+    def ecdh_manager(self):
+        from crypto_modules import ECDHManager
+        return self._get('ecdh_manager', ECDHManager)
+    
+    @property
+    def aes_manager(self):
+        from crypto_modules import AESManager
+        return self._get('aes_manager', AESManager)
+    
+    @property
+    def integrity_manager(self):
+        from crypto_modules import IntegrityManager
+        return self._get('integrity_manager', lambda: IntegrityManager(self.aes_manager))
+    
+    @property
+    def bundle_manager(self):
+        from crypto_modules import BundleManager
+        return self._get('bundle_manager', BundleManager)
+    
+    @property
+    def memory_profiler(self):
+        # Per-operation memory instrumentation (toggled via /memory_profiling)
+        from crypto_modules import MemoryProfiler
+        return self._get('memory_profiler', lambda: MemoryProfiler(enabled=self.config['MEMORY_PROFILING']))
+    
+    @property
+    def metrics_store(self):
+        # Persistent performance history, written in batches
+        def create_store():
+            from crypto_modules import MetricsStore
+            store = MetricsStore(self.config['METRICS_DATABASE'])
+            atexit.register(store.close)
+            return store
+        return self._get('metrics_store', create_store)
+
+def create_app(config=None):
+    """
+    Create the Flask application
+    Args:
+        config: dict of config overrides (optional)
+    Returns:
+        Flask app
+    """
+    app = Flask(__name__)
+    app.secret_key = 'hybrid-ecc-aes192-secret-key-2023'
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['UPLOAD_FOLDER'] = 'uploads'
+    app.config['KEYS_FOLDER'] = 'keys'
+    app.config['ENCRYPTED_FOLDER'] = 'encrypted'
+    app.config['METRICS_DATABASE'] = os.environ.get('METRICS_DATABASE', 'metrics.db')
+    app.config['MEMORY_PROFILING'] = os.environ.get('MEMORY_PROFILING') == '1'
+    app.config['MAX_BATCH_PEERS'] = 10000  # Peer keys per batch key exchange request
+    app.config['MAX_PERFORMANCE_LOGS'] = 5000  # Log entries per /performance response
+    if config:
+        app.config.update(config)
+    
+    # Create necessary directories
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['KEYS_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['ENCRYPTED_FOLDER'], exist_ok=True)
+    
+    app.extensions['crypto_components'] = CryptoComponents(app.config)
+    app.register_blueprint(bp)
+    
+    return app
+
+_app = None
+
+def __getattr__(name):
+    """Create the module-level `app` (e.g. for `flask run` or gunicorn app:app) on first access"""
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def session_keys(party):
+    """
+    Key hierarchy (SessionKeys) of 'alice' or 'bob' for the current key pairs
+    ECDH runs once per key pair instead of on every request
+    """
+    cache = session_data['session_keys']
+    if party not in cache:
+        peer = 'bob' if party == 'alice' else 'alice'
+        cache[party] = components().ecdh_manager.derive_session_keys(
+            session_data[f'{party}_keys']['private_key'],
+            session_data[f'{peer}_keys']['public_key']
+        )['session_keys']
+    return cache[party]
+
+def components():
+    """Crypto components of the current app"""
+    return current_app.extensions['crypto_components']
+
+def profile_memory(view):
+    """Measure memory of a route while instrumentation is enabled"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.memory_measurement = components().memory_profiler.start()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            # Routes that fail before logging still end their measurement
+            if g.memory_measurement is not None:
+                g.memory_measurement.finish()
+    return wrapper
+
+def log_performance(entry):
+    """Record a performance log entry, with memory usage when instrumented"""
+    measurement = g.get('memory_measurement')
+    if measurement is not None:
+        entry['memory'] = measurement.snapshot()
+    entry['timestamp'] = time.time()
+    components().metrics_store.record(entry)
+
+@bp.route('/')
 def index():
     """Main page"""
     return render_template('index.html')
 
-@app.route('/generate_keys')
+@bp.route('/generate_keys')
+@profile_memory
 def generate_keys():
     """Generate ECC keypairs for Alice and Bob"""
     try:
@@ -52,18 +181,19 @@ def generate_keys():
         cleanup_old_keys()
         
         # Generate Alice's keypair
-        alice_keys = ecc_manager.generate_keypair('alice')
+        alice_keys = components().ecc_manager.generate_keypair('alice')
         
         # Generate Bob's keypair
-        bob_keys = ecc_manager.generate_keypair('bob')
+        bob_keys = components().ecc_manager.generate_keypair('bob')
         
         # Store in session
         session_data['alice_keys'] = alice_keys
         session_data['bob_keys'] = bob_keys
+        session_data['session_keys'] = {}
         
         # Get PEM strings for display
-        alice_public_pem = ecc_manager.get_public_key_pem(alice_keys['public_key'])
-        bob_public_pem = ecc_manager.get_public_key_pem(bob_keys['public_key'])
+        alice_public_pem = components().ecc_manager.get_public_key_pem(alice_keys['public_key'])
+        bob_public_pem = components().ecc_manager.get_public_key_pem(bob_keys['public_key'])
         
         result = {
             'success': True,
@@ -79,12 +209,11 @@ def generate_keys():
         }
         
         # Log performance
-        session_data['performance_logs'].append({
+        log_performance({
             'operation': 'Key Generation',
             'alice_time': alice_keys['generation_time'],
             'bob_time': bob_keys['generation_time'],
-            'total_time': result['total_generation_time'],
-            'timestamp': time.time()
+            'total_time': result['total_generation_time']
         })
         
         return jsonify(result)
@@ -103,7 +232,8 @@ def cleanup_old_keys():
             except Exception:
                 pass  # Ignore errors during cleanup
 
-@app.route('/key_exchange')
+@bp.route('/key_exchange')
+@profile_memory
 def key_exchange():
     """Perform ECDH key exchange"""
     try:
@@ -111,7 +241,7 @@ def key_exchange():
             return jsonify({'success': False, 'error': 'Keys not generated. Please generate keys first.'})
         
         # Perform key exchange verification
-        verification = ecdh_manager.verify_key_exchange(
+        verification = components().ecdh_manager.verify_key_exchange(
             session_data['alice_keys']['private_key'],
             session_data['alice_keys']['public_key'],
             session_data['bob_keys']['private_key'],
@@ -120,6 +250,11 @@ def key_exchange():
         
         session_data['shared_secret_info'] = verification
         
+        # Derive the session master keys now, off the per-file path
+        session_data['session_keys'] = {}
+        session_keys('alice')
+        session_keys('bob')
+        
         result = {
             'success': True,
             'keys_match': verification['keys_match'],
@@ -135,12 +270,73 @@ def key_exchange():
         }
         
         # Log performance
-        session_data['performance_logs'].append({
+        log_performance({
             'operation': 'Key Exchange (ECDH + HKDF)',
             'alice_time': verification['total_alice_time'],
             'bob_time': verification['total_bob_time'],
-            'total_time': verification['total_alice_time'] + verification['total_bob_time'],
-            'timestamp': time.time()
+            'total_time': verification['total_alice_time'] + verification['total_bob_time']
+        })
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/batch_key_exchange', methods=['POST'])
+@profile_memory
+def batch_key_exchange():
+    """Derive AES keys between one party and many peer public keys"""
+    try:
+        if not session_data['alice_keys'] or not session_data['bob_keys']:
+            return jsonify({'success': False, 'error': 'Keys not generated. Please generate keys first.'})
+        
+        data = request.get_json(silent=True) or {}
+        peer_public_keys = data.get('peer_public_keys')
+        if not isinstance(peer_public_keys, list) or not peer_public_keys:
+            return jsonify({'success': False, 'error': 'peer_public_keys must be a non-empty list of PEM strings'})
+        if len(peer_public_keys) > current_app.config['MAX_BATCH_PEERS']:
+            return jsonify({
+                'success': False,
+                'error': f"Too many peer keys (maximum {current_app.config['MAX_BATCH_PEERS']} per request)"
+            })
+        
+        party = data.get('party', 'alice')
+        if party not in ('alice', 'bob'):
+            return jsonify({'success': False, 'error': "party must be 'alice' or 'bob'"})
+        
+        workers = data.get('workers')
+        if workers is not None and (not isinstance(workers, int) or not 1 <= workers <= 32):
+            return jsonify({'success': False, 'error': 'workers must be an integer between 1 and 32'})
+        
+        batch = components().ecdh_manager.batch_exchange(
+            session_data[f'{party}_keys']['private_key'],
+            [str(pem) for pem in peer_public_keys],
+            workers=workers,
+            include_timing=bool(data.get('include_timing'))
+        )
+        
+        result = {
+            'success': True,
+            'party': party,
+            'count': batch['count'],
+            'failed': batch['failed'],
+            'aes_keys': [key.hex() if key is not None else None for key in batch['keys']],
+            'errors': {str(index): error for index, error in batch['errors'].items()},
+            'batch_time': batch['batch_time'],
+            'average_time': batch['batch_time'] / batch['count'],
+            'workers': batch['workers']
+        }
+        if 'timings' in batch:
+            result['timings'] = batch['timings']
+        
+        # Log performance
+        log_performance({
+            # Not named 'Key Exchange' so batches do not skew the per-exchange average
+            'operation': 'Batch ECDH + HKDF',
+            'peer_count': batch['count'],
+            'failed': batch['failed'],
+            'workers': batch['workers'],
+            'total_time': batch['batch_time']
         })
         
         return jsonify(result)
@@ -148,7 +344,8 @@ def key_exchange():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/encrypt_file', methods=['POST'])
+@bp.route('/encrypt_file', methods=['POST'])
+@profile_memory
 def encrypt_file():
     """Encrypt uploaded file"""
     try:
@@ -167,30 +364,21 @@ def encrypt_file():
         
         # Save uploaded file
         filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(file_path)
         
-        # Get AES key from session
-        alice_keys = session_data['alice_keys']
-        bob_public_key = session_data['bob_keys']['public_key']
-        
-        # Compute shared secret and derive AES key
-        shared_secret = ecdh_manager.compute_shared_secret(
-            alice_keys['private_key'], 
-            bob_public_key
-        )
-        aes_key_info = ecdh_manager.derive_aes_key(shared_secret['shared_secret'])
-        aes_key = aes_key_info['aes_key']
+        # Per-file subkey from the session master key; its salt goes in the package
+        aes_key, key_header = session_keys('alice').new_file_key()
         
         # Encrypt file
         if mode == 'gcm':
-            encryption_result = aes_manager.encrypt_file_gcm(file_path, aes_key)
+            encryption_result = components().aes_manager.encrypt_file_gcm(file_path, aes_key, header=key_header)
         else:
-            encryption_result = aes_manager.encrypt_file_cbc(file_path, aes_key)
+            encryption_result = components().aes_manager.encrypt_file_cbc(file_path, aes_key, header=key_header)
         
         # Move encrypted file to encrypted folder
         encrypted_filename = os.path.basename(encryption_result['encrypted_file_path'])
-        encrypted_final_path = os.path.join(app.config['ENCRYPTED_FOLDER'], encrypted_filename)
+        encrypted_final_path = os.path.join(current_app.config['ENCRYPTED_FOLDER'], encrypted_filename)
         shutil.move(encryption_result['encrypted_file_path'], encrypted_final_path)
         
         result = {
@@ -212,12 +400,11 @@ def encrypt_file():
             result['iv'] = encryption_result['iv']
         
         # Log performance
-        session_data['performance_logs'].append({
+        log_performance({
             'operation': f'File Encryption ({result["algorithm"]})',
             'encryption_time': encryption_result['encryption_time'],
             'original_size': encryption_result['original_size'],
-            'encrypted_size': encryption_result['encrypted_size'],
-            'timestamp': time.time()
+            'encrypted_size': encryption_result['encrypted_size']
         })
         
         # Clean up original file
@@ -228,7 +415,8 @@ def encrypt_file():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/decrypt_file', methods=['POST'])
+@bp.route('/decrypt_file', methods=['POST'])
+@profile_memory
 def decrypt_file():
     """Decrypt uploaded encrypted file"""
     try:
@@ -244,36 +432,27 @@ def decrypt_file():
         
         # Save uploaded encrypted file
         filename = secure_filename(file.filename)
-        encrypted_file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        encrypted_file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(encrypted_file_path)
         
-        # Get AES key from session (Bob's perspective)
-        bob_keys = session_data['bob_keys']
-        alice_public_key = session_data['alice_keys']['public_key']
-        
-        # Compute shared secret and derive AES key
-        shared_secret = ecdh_manager.compute_shared_secret(
-            bob_keys['private_key'], 
-            alice_public_key
-        )
-        aes_key_info = ecdh_manager.derive_aes_key(shared_secret['shared_secret'])
-        aes_key = aes_key_info['aes_key']
-        
         # Determine encryption mode by checking file content
         with open(encrypted_file_path, 'r') as f:
             encrypted_package = json.load(f)
         
+        # Get AES key for this package from session (Bob's perspective)
+        aes_key = session_keys('bob').key_for_header(encrypted_package)
+        
         if encrypted_package.get('algorithm') == 'AES-192-GCM':
-            decryption_result = aes_manager.decrypt_file_gcm(encrypted_file_path, aes_key)
+            decryption_result = components().aes_manager.decrypt_file_gcm(encrypted_file_path, aes_key)
         else:
-            decryption_result = aes_manager.decrypt_file_cbc(encrypted_file_path, aes_key)
+            decryption_result = components().aes_manager.decrypt_file_cbc(encrypted_file_path, aes_key)
         
         if not decryption_result['success']:
             return jsonify({'success': False, 'error': decryption_result['error']})
         
         # Move decrypted file to uploads folder
         decrypted_filename = os.path.basename(decryption_result['decrypted_file_path'])
-        decrypted_final_path = os.path.join(app.config['UPLOAD_FOLDER'], decrypted_filename)
+        decrypted_final_path = os.path.join(current_app.config['UPLOAD_FOLDER'], decrypted_filename)
         shutil.move(decryption_result['decrypted_file_path'], decrypted_final_path)
         
         result = {
@@ -286,12 +465,11 @@ def decrypt_file():
         }
         
         # Log performance
-        session_data['performance_logs'].append({
+        log_performance({
             'operation': 'File Decryption',
             'decryption_time': decryption_result['decryption_time'],
             'original_encrypted_size': decryption_result['original_encrypted_size'],
-            'decrypted_size': decryption_result['decrypted_size'],
-            'timestamp': time.time()
+            'decrypted_size': decryption_result['decrypted_size']
         })
         
         # Clean up encrypted file
@@ -302,17 +480,179 @@ def decrypt_file():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/download_file/<filename>')
+@bp.route('/encrypt_bundle', methods=['POST'])
+@profile_memory
+def encrypt_bundle():
+    """Encrypt many uploaded files (or a directory upload) into one bundle"""
+    try:
+        files = [file for file in request.files.getlist('files') if file.filename]
+        if not files:
+            return jsonify({'success': False, 'error': 'No files uploaded'})
+        
+        if not session_data['shared_secret_info']:
+            return jsonify({'success': False, 'error': 'Key exchange not performed. Please perform key exchange first.'})
+        
+        # Directory uploads send relative paths as filenames; keep the
+        # structure but sanitize every path component
+        arcnames = []
+        for file in files:
+            parts = [secure_filename(part) for part in file.filename.replace('\\', '/').split('/')]
+            arcnames.append('/'.join(part for part in parts if part))
+        if '' in arcnames or len(set(arcnames)) != len(arcnames):
+            return jsonify({'success': False, 'error': 'Invalid or duplicate filenames in upload'})
+        
+        bundle_filename = secure_filename(request.form.get('bundle_name', '')) or 'bundle'
+        from crypto_modules.bundle_module import BUNDLE_EXTENSION
+        bundle_filename += BUNDLE_EXTENSION
+        
+        # Per-bundle subkey from the session master key; its salt goes in the bundle header
+        aes_key, key_header = session_keys('alice').new_file_key()
+        
+        # Members are streamed straight from the upload, without a copy in uploads/
+        bundle_result = components().bundle_manager.create_bundle(
+            [file.stream for file in files],
+            aes_key,
+            os.path.join(current_app.config['ENCRYPTED_FOLDER'], bundle_filename),
+            arcnames,
+            header=key_header
+        )
+        
+        result = {
+            'success': True,
+            'bundle_filename': bundle_filename,
+            'member_count': bundle_result['member_count'],
+            'encryption_time': bundle_result['encryption_time'],
+            'original_size': bundle_result['original_size'],
+            'encrypted_size': bundle_result['encrypted_size'],
+            'size_increase': bundle_result['size_increase'],
+            'size_increase_percent': bundle_result['size_increase_percent'],
+            'algorithm': 'AES-192-GCM'
+        }
+        
+        # Log performance
+        log_performance({
+            'operation': 'Bundle Encryption (AES-192-GCM)',
+            'encryption_time': bundle_result['encryption_time'],
+            'member_count': bundle_result['member_count'],
+            'original_size': bundle_result['original_size'],
+            'encrypted_size': bundle_result['encrypted_size']
+        })
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/list_bundle/<filename>')
+def list_bundle(filename):
+    """List members of a stored bundle by decrypting only its index"""
+    try:
+        if not session_data['shared_secret_info']:
+            return jsonify({'success': False, 'error': 'Key exchange not performed. Please perform key exchange first.'})
+        
+        bundle_path = os.path.join(current_app.config['ENCRYPTED_FOLDER'], secure_filename(filename))
+        if not os.path.exists(bundle_path):
+            return jsonify({'success': False, 'error': 'File not found'})
+        
+        # The bundle's key comes from its header (Bob's perspective)
+        aes_key = session_keys('bob').key_for_header
+        
+        listing = components().bundle_manager.list_bundle(bundle_path, aes_key)
+        return jsonify(listing)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/extract_bundle/<filename>')
+@profile_memory
+def extract_bundle(filename):
+    """Decrypt a single member of a stored bundle"""
+    try:
+        member = request.args.get('member')
+        if not member:
+            return jsonify({'success': False, 'error': 'No member selected'})
+        
+        if not session_data['shared_secret_info']:
+            return jsonify({'success': False, 'error': 'Key exchange not performed. Please perform key exchange first.'})
+        
+        bundle_path = os.path.join(current_app.config['ENCRYPTED_FOLDER'], secure_filename(filename))
+        if not os.path.exists(bundle_path):
+            return jsonify({'success': False, 'error': 'File not found'})
+        
+        # The bundle's key comes from its header (Bob's perspective)
+        aes_key = session_keys('bob').key_for_header
+        
+        decrypted_filename = secure_filename(member.rsplit('/', 1)[-1]) or 'decrypted_file'
+        extraction_result = components().bundle_manager.extract_member(
+            bundle_path,
+            aes_key,
+            member,
+            os.path.join(current_app.config['UPLOAD_FOLDER'], decrypted_filename)
+        )
+        
+        if not extraction_result['success']:
+            return jsonify({'success': False, 'error': extraction_result['error']})
+        
+        result = {
+            'success': True,
+            'bundle_filename': filename,
+            'member': member,
+            'decrypted_filename': decrypted_filename,
+            'decryption_time': extraction_result['decryption_time'],
+            'decrypted_size': extraction_result['decrypted_size']
+        }
+        
+        # Log performance
+        log_performance({
+            'operation': 'Bundle Member Decryption',
+            'decryption_time': extraction_result['decryption_time'],
+            'decrypted_size': extraction_result['decrypted_size']
+        })
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/verify_encrypted')
+@profile_memory
+def verify_encrypted():
+    """Verify integrity of all encrypted packages without decrypting them to disk"""
+    try:
+        if not session_data['shared_secret_info']:
+            return jsonify({'success': False, 'error': 'Key exchange not performed. Please perform key exchange first.'})
+        
+        # Each package's key comes from its header (Bob's perspective)
+        report = components().integrity_manager.scan_directory(
+            current_app.config['ENCRYPTED_FOLDER'],
+            session_keys('bob').key_for_header,
+            include_ok=request.args.get('include_ok') == 'true'
+        )
+        
+        # Log performance
+        log_performance({
+            'operation': 'Integrity Scan',
+            'scan_time': report['scan_time'],
+            'files_scanned': report['files_scanned'],
+            'bytes_scanned': report['bytes_scanned']
+        })
+        
+        return jsonify({'success': True, **report})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/download_file/<filename>')
 def download_file(filename):
     """Download file from uploads or encrypted folder"""
     try:
         # Try uploads folder first
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         if os.path.exists(file_path):
             return send_file(file_path, as_attachment=True)
         
         # Try encrypted folder
-        file_path = os.path.join(app.config['ENCRYPTED_FOLDER'], filename)
+        file_path = os.path.join(current_app.config['ENCRYPTED_FOLDER'], filename)
         if os.path.exists(file_path):
             return send_file(file_path, as_attachment=True)
         
@@ -321,34 +661,41 @@ def download_file(filename):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/performance')
+@bp.route('/performance')
 def performance():
-    """Get performance analysis"""
+    """
+    Get performance analysis
+    Query filters: since, until (unix timestamps), operation, category,
+    size_bucket, min_size, max_size (bytes) and limit (default 500, max
+    MAX_PERFORMANCE_LOGS)
+    """
     try:
-        logs = session_data['performance_logs']
-        
-        # Calculate statistics
-        total_operations = len(logs)
-        if total_operations == 0:
-            return jsonify({'success': True, 'logs': [], 'statistics': {}})
-        
-        # Group by operation type
-        key_gen_logs = [log for log in logs if 'Key Generation' in log['operation']]
-        key_exchange_logs = [log for log in logs if 'Key Exchange' in log['operation']]
-        encryption_logs = [log for log in logs if 'Encryption' in log['operation']]
-        decryption_logs = [log for log in logs if 'Decryption' in log['operation']]
-        
-        statistics = {
-            'total_operations': total_operations,
-            'key_generation_count': len(key_gen_logs),
-            'key_exchange_count': len(key_exchange_logs),
-            'encryption_count': len(encryption_logs),
-            'decryption_count': len(decryption_logs),
-            'average_key_generation_time': sum(log['total_time'] for log in key_gen_logs) / len(key_gen_logs) if key_gen_logs else 0,
-            'average_key_exchange_time': sum(log['total_time'] for log in key_exchange_logs) / len(key_exchange_logs) if key_exchange_logs else 0,
-            'average_encryption_time': sum(log['encryption_time'] for log in encryption_logs) / len(encryption_logs) if encryption_logs else 0,
-            'average_decryption_time': sum(log['decryption_time'] for log in decryption_logs) / len(decryption_logs) if decryption_logs else 0,
+        from crypto_modules.metrics_module import SIZE_BUCKETS
+        
+        filters = {
+            'operation': request.args.get('operation'),
+            'category': request.args.get('category'),
+            'size_bucket': request.args.get('size_bucket')
         }
+        # Reject unparsable values instead of silently dropping the filter
+        numeric = {'since': float, 'until': float, 'min_size': int, 'max_size': int, 'limit': int}
+        for name, convert in numeric.items():
+            value = request.args.get(name)
+            try:
+                filters[name] = convert(value) if value is not None else None
+            except ValueError:
+                return jsonify({'success': False, 'error': f'Invalid value for {name}: {value!r}'})
+        limit = filters.pop('limit')
+        if limit is not None and limit < 1:
+            return jsonify({'success': False, 'error': 'limit must be at least 1'})
+        if filters['size_bucket'] is not None and filters['size_bucket'] not in dict(SIZE_BUCKETS):
+            return jsonify({'success': False, 'error': f"Unknown size bucket. Use one of: {', '.join(dict(SIZE_BUCKETS))}"})
+        
+        # SQLite treats a negative LIMIT as unlimited, so never pass one through
+        limit = min(500 if limit is None else limit, current_app.config['MAX_PERFORMANCE_LOGS'])
+        logs = components().metrics_store.query(limit=limit, **filters)
+        statistics = components().metrics_store.statistics(**filters)
+        statistics['memory_profiling_enabled'] = components().memory_profiler.enabled
         
         return jsonify({
             'success': True,
@@ -359,7 +706,20 @@ def performance():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/reset')
+@bp.route('/memory_profiling')
+def memory_profiling():
+    """Get or toggle per-operation memory instrumentation (?enabled=true|false)"""
+    try:
+        enabled = request.args.get('enabled')
+        if enabled is not None:
+            components().memory_profiler.set_enabled(enabled.lower() in ('1', 'true', 'on', 'yes'))
+        
+        return jsonify({'success': True, 'enabled': components().memory_profiler.enabled})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/reset')
 def reset():
     """Reset session data"""
     global session_data
@@ -367,11 +727,15 @@ def reset():
         'alice_keys': None,
         'bob_keys': None,
         'shared_secret_info': None,
-        'performance_logs': []
+        'session_keys': {}
     }
     
+    # Performance history is persistent and only cleared on request
+    if request.args.get('clear_metrics') == 'true':
+        components().metrics_store.clear()
+    
     # Clean up files
-    for folder in [app.config['UPLOAD_FOLDER'], app.config['KEYS_FOLDER'], app.config['ENCRYPTED_FOLDER']]:
+    for folder in [current_app.config['UPLOAD_FOLDER'], current_app.config['KEYS_FOLDER'], current_app.config['ENCRYPTED_FOLDER']]:
         for filename in os.listdir(folder):
             file_path = os.path.join(folder, filename)
             try:
@@ -382,10 +746,10 @@ def reset():
     
     return jsonify({'success': True, 'message': 'System reset successfully'})
 
-@app.errorhandler(413)
+@bp.app_errorhandler(413)
 def too_large(e):
     """Handle file too large error"""
     return jsonify({'success': False, 'error': 'File too large. Maximum size is 16MB.'})
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5002)
+    create_app().run(debug=True, host='0.0.0.0', port=5002)
@@ -0,0 +1,626 @@
+"""
+Load Testing Harness for Hybrid ECC-AES192 System
+Replays weighted mixes of the Flask routes with concurrent clients and
+reports throughput, latency percentiles, error rates and server RSS
+
+Examples:
+    python benchmarks/loadtest.py --clients 8 --requests 500 --output run.json
+    python benchmarks/loadtest.py --serve --duration 60 --sizes 2KB=80,1MB=20
+    python benchmarks/loadtest.py --url http://127.0.0.1:5002 --server-pid 4242
+    python benchmarks/loadtest.py --compare baseline.json --output run.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = ('generate_keys', 'key_exchange', 'encrypt_file', 'decrypt_file')
+
+# /generate_keys rotates the key pairs, which invalidates every ciphertext
+# prepared during setup, so it is left out of the default mix
+DEFAULT_MIX = 'encrypt_file=6,decrypt_file=3,key_exchange=1'
+DEFAULT_SIZES = '2KB=40,64KB=30,1MB=20,8MB=10'
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(text):
+    """Parse a human readable size such as '64KB' into bytes"""
+    text = text.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+
+def parse_weights(spec):
+    """
+    Parse a 'name=weight,name=weight' spec
+    Returns: list of (name, weight) with non-zero weights
+    """
+    weights = []
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        weight = float(weight) if weight else 1.0
+        if weight < 0:
+            raise ValueError(f'Negative weight for {name!r}')
+        if weight > 0:
+            weights.append((name.strip(), weight))
+    if not weights:
+        raise ValueError(f'No positive weights in {spec!r}')
+    return weights
+
+
+def percentile(sorted_values, p):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * (p / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def read_rss(pid):
+    """
+    Read resident set size of a process in bytes
+    Falls back to the peak RSS of this process where /proc is unavailable
+    """
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+    return None
+
+
+def latency_summary(latencies):
+    """Summarize latencies (seconds) as milliseconds"""
+    values = sorted(latencies)
+    if not values:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+    return {
+        'p50': percentile(values, 50) * 1000,
+        'p95': percentile(values, 95) * 1000,
+        'p99': percentile(values, 99) * 1000,
+        'mean': sum(values) / len(values) * 1000,
+        'max': values[-1] * 1000
+    }
+
+
+def git_commit():
+    """Return the current git commit of the repository, if available"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+class TestClientTransport:
+    """Drive the app in-process through Flask test clients (one per thread)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.data
+
+    def post_file(self, path, filename, data, fields=None):
+        form = dict(fields or {})
+        form['file'] = (io.BytesIO(data), filename)
+        response = self.client.post(path, data=form, content_type='multipart/form-data')
+        return response.status_code, response.data
+
+
+class HttpTransport:
+    """Drive a running server over HTTP"""
+
+    def __init__(self, base_url, timeout=300):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _open(self, req):
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post_file(self, path, filename, data, fields=None):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in (fields or {}).items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'.encode()
+            )
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode()
+        )
+        parts.append(data)
+        parts.append(f'\r\n--{boundary}--\r\n'.encode())
+        req = urllib.request.Request(
+            self.base_url + path,
+            data=b''.join(parts),
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'},
+            method='POST'
+        )
+        return self._open(req)
+
+
+class RssSampler(threading.Thread):
+    """
+    Background thread sampling the server RSS
+    in_process marks a server sharing this process, whose RSS also counts
+    the harness's payloads and cached packages
+    """
+
+    def __init__(self, pid, interval=0.25, in_process=False):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.in_process = in_process
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = read_rss(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        rss = read_rss(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+
+    def summary(self):
+        if not self.samples:
+            return {'pid': self.pid, 'available': False, 'in_process': self.in_process}
+        mb = 1024 ** 2
+        return {
+            'pid': self.pid,
+            'available': True,
+            'in_process': self.in_process,
+            'start_mb': self.samples[0] / mb,
+            'peak_mb': max(self.samples) / mb,
+            'end_mb': self.samples[-1] / mb,
+            'mean_mb': sum(self.samples) / len(self.samples) / mb,
+            'sample_count': len(self.samples)
+        }
+
+
+class LoadTest:
+    def __init__(self, transport, mix, sizes, clients, requests=None, duration=None,
+                 mode='gcm', seed=None):
+        """
+        Initialize load test
+        Args:
+            transport: TestClientTransport or HttpTransport
+            mix: list of (endpoint, weight)
+            sizes: list of (size_label, weight) for uploaded payloads
+            clients: number of concurrent clients
+            requests: total number of requests (optional)
+            duration: run duration in seconds (optional)
+            mode: encryption mode for /encrypt_file ('gcm' or 'cbc')
+            seed: random seed for reproducible request sequences
+        """
+        for endpoint, _ in mix:
+            if endpoint not in ENDPOINTS:
+                raise ValueError(f'Unknown endpoint {endpoint!r}, expected one of {ENDPOINTS}')
+        self.transport = transport
+        self.mix = mix
+        self.sizes = sizes
+        self.clients = clients
+        self.requests = requests
+        self.duration = duration
+        self.mode = mode
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+
+        self.payloads = {}
+        self.packages = {}
+        self.records = []
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._deadline = None
+
+    def _call(self, endpoint, size_label=None, name=None):
+        """Issue one request, returns (ok, error)"""
+        if endpoint in ('generate_keys', 'key_exchange'):
+            status, body = self.transport.get('/' + endpoint)
+        elif endpoint == 'encrypt_file':
+            status, body = self.transport.post_file(
+                '/encrypt_file', f'{name}.bin', self.payloads[size_label], {'mode': self.mode}
+            )
+        else:
+            head, tail = self.packages[size_label]
+            status, body = self.transport.post_file(
+                '/decrypt_file', f'{name}.bin.enc', head + f'{name}.bin'.encode() + tail
+            )
+
+        if status != 200:
+            return False, f'HTTP {status}'
+        try:
+            result = json.loads(body)
+        except ValueError:
+            return False, 'Invalid JSON response'
+        if not result.get('success'):
+            return False, result.get('error') or 'Unknown error'
+        return True, result
+
+    def setup(self):
+        """Generate keys, perform key exchange and prepare decryptable payloads"""
+        for endpoint in ('generate_keys', 'key_exchange'):
+            ok, result = self._call(endpoint)
+            if not ok:
+                raise RuntimeError(f'Setup {endpoint} failed: {result}')
+
+        rng = random.Random(self.seed)
+        for label, _ in self.sizes:
+            self.payloads[label] = rng.randbytes(parse_size(label))
+
+        if any(endpoint == 'decrypt_file' for endpoint, _ in self.mix):
+            for label, _ in self.sizes:
+                seed_name = f'loadtest_seed_{uuid.uuid4().hex}'
+                ok, result = self._call('encrypt_file', label, seed_name)
+                if not ok:
+                    raise RuntimeError(f'Setup encryption of {label} failed: {result}')
+                status, package = self.transport.get(
+                    '/download_file/' + result['encrypted_filename']
+                )
+                if status != 200:
+                    raise RuntimeError(f'Setup download of {label} failed: HTTP {status}')
+                # The filename is stored in clear text inside the package, so
+                # splitting around it lets every decrypt request use its own
+                # output name without re-encrypting
+                head, _, tail = package.partition(f'{seed_name}.bin'.encode())
+                self.packages[label] = (head, tail)
+
+    def _next_slot(self):
+        with self._lock:
+            if self.requests is not None and self._issued >= self.requests:
+                return False
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                return False
+            self._issued += 1
+            return True
+
+    def _client(self, client_id):
+        rng = random.Random(self.seed + client_id + 1)
+        endpoints, endpoint_weights = zip(*self.mix)
+        labels, label_weights = zip(*self.sizes)
+        sequence = 0
+        records = []
+        while self._next_slot():
+            endpoint = rng.choices(endpoints, endpoint_weights)[0]
+            size_label = None
+            if endpoint in ('encrypt_file', 'decrypt_file'):
+                size_label = rng.choices(labels, label_weights)[0]
+            name = f'lt_{client_id}_{sequence}_{uuid.uuid4().hex[:8]}'
+            sequence += 1
+
+            start = time.perf_counter()
+            try:
+                ok, result = self._call(endpoint, size_label, name)
+            except Exception as e:
+                ok, result = False, f'{type(e).__name__}: {e}'
+            latency = time.perf_counter() - start
+
+            records.append({
+                'endpoint': endpoint,
+                'size': size_label,
+                'latency': latency,
+                'ok': ok,
+                'error': None if ok else str(result)
+            })
+        with self._lock:
+            self.records.extend(records)
+
+    def run(self):
+        """Run the configured clients until the request or time budget is spent"""
+        threads = [
+            threading.Thread(target=self._client, args=(client_id,), daemon=True)
+            for client_id in range(self.clients)
+        ]
+        start = time.perf_counter()
+        if self.duration is not None:
+            self._deadline = start + self.duration
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def _group_summary(self, records, elapsed):
+        errors = [record for record in records if not record['ok']]
+        error_counts = {}
+        for record in errors:
+            error_counts[record['error']] = error_counts.get(record['error'], 0) + 1
+        return {
+            'requests': len(records),
+            'errors': len(errors),
+            'error_rate': len(errors) / len(records) if records else 0.0,
+            'throughput_rps': len(records) / elapsed if elapsed else 0.0,
+            'latency_ms': latency_summary([record['latency'] for record in records]),
+            'top_errors': sorted(error_counts.items(), key=lambda item: -item[1])[:5]
+        }
+
+    def report(self, elapsed):
+        """Build the JSON-serializable report"""
+        summary = self._group_summary(self.records, elapsed)
+        summary['duration_s'] = elapsed
+        summary['bytes_uploaded'] = sum(
+            parse_size(record['size']) for record in self.records if record['size']
+        )
+
+        endpoints = {}
+        for endpoint, _ in self.mix:
+            records = [record for record in self.records if record['endpoint'] == endpoint]
+            endpoints[endpoint] = self._group_summary(records, elapsed)
+
+        by_size = {}
+        for record in self.records:
+            if record['size']:
+                by_size.setdefault(f"{record['endpoint']}:{record['size']}", []).append(record)
+
+        return {
+            'summary': summary,
+            'endpoints': endpoints,
+            'by_size': {
+                key: self._group_summary(records, elapsed)
+                for key, records in sorted(by_size.items())
+            }
+        }
+
+
+def print_report(results):
+    """Print a human readable summary"""
+    summary = results['summary']
+    print(f"\nRequests: {summary['requests']}  errors: {summary['errors']} "
+          f"({summary['error_rate'] * 100:.2f}%)  duration: {summary['duration_s']:.2f}s  "
+          f"throughput: {summary['throughput_rps']:.2f} req/s")
+    header = f"{'endpoint':<28}{'reqs':>7}{'err%':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print('-' * len(header))
+    rows = list(results['endpoints'].items()) + list(results['by_size'].items())
+    for name, group in rows:
+        latency = group['latency_ms']
+        print(f"{name:<28}{group['requests']:>7}{group['error_rate'] * 100:>8.2f}"
+              f"{group['throughput_rps']:>9.2f}{latency['p50']:>10.2f}"
+              f"{latency['p95']:>10.2f}{latency['p99']:>10.2f}")
+    rss = results.get('server_rss') or results.get('process_rss') or {}
+    if rss.get('available'):
+        label = 'Process RSS, server + harness' if rss.get('in_process') else 'Server RSS'
+        print(f"{label} (pid {rss['pid']}): start {rss['start_mb']:.1f}MB  "
+              f"peak {rss['peak_mb']:.1f}MB  end {rss['end_mb']:.1f}MB  "
+              f"growth {rss['peak_mb'] - rss['start_mb']:.1f}MB")
+
+
+def print_comparison(baseline, results):
+    """Print per-endpoint deltas against a previous results file"""
+    print(f"\nComparison against {baseline['meta'].get('git_commit') or 'baseline'}:")
+    for name, group in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        deltas = []
+        for key in ('p50', 'p95', 'p99'):
+            before = previous['latency_ms'][key]
+            after = group['latency_ms'][key]
+            change = ((after - before) / before * 100) if before else 0.0
+            deltas.append(f'{key} {before:.2f}->{after:.2f}ms ({change:+.1f}%)')
+        before_rps = previous['throughput_rps']
+        change = ((group['throughput_rps'] - before_rps) / before_rps * 100) if before_rps else 0.0
+        deltas.append(f"rps {before_rps:.2f}->{group['throughput_rps']:.2f} ({change:+.1f}%)")
+        print(f"  {name}: " + ', '.join(deltas))
+
+
+def load_app():
+    """Create the Flask app from the repository root"""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from app import create_app
+    # send_file resolves relative paths against the app root, not the
+    # working directory, so pin the scratch folders to absolute paths
+    return create_app({
+        'UPLOAD_FOLDER': os.path.abspath('uploads'),
+        'KEYS_FOLDER': os.path.abspath('keys'),
+        'ENCRYPTED_FOLDER': os.path.abspath('encrypted')
+    })
+
+
+# Runs in the --serve child process: serves the app and prints its port
+SERVE_SCRIPT = """
+import logging, sys
+sys.path.insert(0, sys.argv[1])
+from loadtest import load_app
+from werkzeug.serving import make_server
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+server = make_server('127.0.0.1', int(sys.argv[2]), load_app(), threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+def start_server(port):
+    """
+    Start the app in a child process of the working directory, so its RSS
+    and GIL are separate from the harness
+    Returns: (process, port) once the server is listening
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVE_SCRIPT, os.path.dirname(os.path.abspath(__file__)), str(port)],
+        stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    if not line.strip().isdigit():
+        process.kill()
+        process.wait()
+        raise RuntimeError('Server process failed to start')
+    return process, int(line)
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the Hybrid ECC-AES192 Flask routes')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--serve', action='store_true',
+                        help='Start the app on a local port and drive it over HTTP')
+    target.add_argument('--url', help='Drive an already running server at this base URL')
+    parser.add_argument('--port', type=int, default=0, help='Port for --serve (default: random)')
+    parser.add_argument('--server-pid', type=int,
+                        help='PID of the server for RSS sampling when using --url')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, help='Total number of requests (default: 200)')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds instead')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f'Endpoint weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Upload size weights (default: {DEFAULT_SIZES})')
+    parser.add_argument('--mode', choices=['gcm', 'cbc'], default='gcm',
+                        help='Encryption mode used for /encrypt_file')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+    original_cwd = os.getcwd()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = None
+    server = None
+    if args.url:
+        transport = HttpTransport(args.url)
+        server_pid = args.server_pid
+        target_name = args.url
+    else:
+        # The app writes keys, uploads and decrypted files relative to the
+        # working directory, so run it inside a scratch directory
+        workdir = tempfile.mkdtemp(prefix='hybrid-loadtest-')
+        os.chdir(workdir)
+        if args.serve:
+            server, port = start_server(args.port)
+            server_pid = server.pid
+            target_name = f'http://127.0.0.1:{port}'
+            transport = HttpTransport(target_name)
+        else:
+            server_pid = os.getpid()
+            target_name = 'test_client'
+            transport = TestClientTransport(load_app())
+
+    try:
+        test = LoadTest(
+            transport,
+            mix=parse_weights(args.mix),
+            sizes=parse_weights(args.sizes),
+            clients=args.clients,
+            requests=args.requests,
+            duration=args.duration,
+            mode=args.mode,
+            seed=args.seed
+        )
+        print(f'Setting up against {target_name} ...')
+        test.setup()
+
+        # Started after setup, so start_mb is a baseline that already holds
+        # the harness's payloads and cached packages
+        in_process = not (args.url or args.serve)
+        sampler = RssSampler(server_pid, in_process=in_process) if server_pid else None
+        if sampler:
+            sampler.start()
+        print(f'Running {args.clients} clients ...')
+        elapsed = test.run()
+        if sampler:
+            sampler.stop()
+
+        results = test.report(elapsed)
+        # In-process runs measure the harness too, so they are not reported as server RSS
+        rss_key = 'process_rss' if in_process else 'server_rss'
+        results[rss_key] = sampler.summary() if sampler else {'available': False, 'in_process': in_process}
+        results['meta'] = {
+            'timestamp': time.time(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target': target_name,
+            'clients': args.clients,
+            'requests': args.requests,
+            'duration': args.duration,
+            'mix': args.mix,
+            'sizes': args.sizes,
+            'mode': args.mode,
+            'seed': test.seed
+        }
+    finally:
+        if server is not None:
+            stop_server(server)
+        if workdir is not None:
+            os.chdir(original_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
+
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResults written to {output_path}')
+
+    return 1 if results['summary']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
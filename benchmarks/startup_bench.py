@@ -0,0 +1,136 @@
+"""
+Startup Benchmark for Hybrid ECC-AES192 System
+Measures cold import and app-factory time in fresh interpreters and fails
+when the median exceeds a budget or the cryptography stack loads at startup
+
+Examples:
+    python benchmarks/startup_bench.py
+    python benchmarks/startup_bench.py --runs 20 --budget-ms 300 --output startup.json
+    python benchmarks/startup_bench.py --top-imports 15
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside a fresh interpreter and prints one JSON line
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+response = application.test_client().get('/')
+first_request = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first_request - created) * 1000,
+    'startup_ms': (created - start) * 1000,
+    'status': response.status_code,
+    'cryptography_loaded': 'cryptography' in sys.modules
+}))
+"""
+
+
+def run_probe(workdir):
+    """Measure one cold start, returns the probe's measurements"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=workdir, env=env)
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def top_imports(workdir, count):
+    """Slowest modules (cumulative microseconds) when importing app"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line.split('|')
+        rows.append((int(cumulative_us), module.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def summarize(values):
+    return {
+        'median': statistics.median(values),
+        'min': min(values),
+        'max': max(values)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold startup of the Flask app')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreters')
+    parser.add_argument('--budget-ms', type=float, default=400.0,
+                        help='Budget for median import + create_app time')
+    parser.add_argument('--top-imports', type=int, default=0, metavar='N',
+                        help='Also list the N slowest imports')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args(argv)
+
+    # create_app creates folders relative to the working directory
+    with tempfile.TemporaryDirectory(prefix='hybrid-startup-') as workdir:
+        # Warm the OS file cache and bytecode so runs are comparable
+        run_probe(workdir)
+        runs = [run_probe(workdir) for _ in range(args.runs)]
+        slowest = top_imports(workdir, args.top_imports) if args.top_imports else []
+
+    results = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'budget_ms': args.budget_ms
+        },
+        'import_ms': summarize([run['import_ms'] for run in runs]),
+        'create_app_ms': summarize([run['create_app_ms'] for run in runs]),
+        'startup_ms': summarize([run['startup_ms'] for run in runs]),
+        'first_request_ms': summarize([run['first_request_ms'] for run in runs]),
+        'process_ms': summarize([run['process_ms'] for run in runs]),
+        'cryptography_loaded_at_startup': any(run['cryptography_loaded'] for run in runs),
+        'top_imports': [{'module': module, 'cumulative_ms': us / 1000} for us, module in slowest]
+    }
+    within_budget = (
+        results['startup_ms']['median'] <= args.budget_ms
+        and not results['cryptography_loaded_at_startup']
+    )
+    results['within_budget'] = within_budget
+
+    for key in ('import_ms', 'create_app_ms', 'startup_ms', 'first_request_ms', 'process_ms'):
+        stats = results[key]
+        print(f"{key:<18} median {stats['median']:8.1f}  min {stats['min']:8.1f}  max {stats['max']:8.1f}")
+    print(f"cryptography loaded at startup: {results['cryptography_loaded_at_startup']}")
+    for row in results['top_imports']:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+    print(f"Startup median {results['startup_ms']['median']:.1f} ms, budget {args.budget_ms:.1f} ms, "
+          f"cryptography deferred: {not results['cryptography_loaded_at_startup']}: "
+          f"{'OK' if within_budget else 'OVER BUDGET'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if within_budget else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+Bulk Encryption CLI for Hybrid ECC-AES192 System
+Encrypts, decrypts or verifies whole directory trees outside the web app
+
+Examples:
+    python bulk_crypto.py encrypt data/ encrypted/ --private-key alice_private.pem --peer-public-key bob_public.pem
+    python bulk_crypto.py decrypt encrypted/ restored/ --private-key bob_private.pem --peer-public-key alice_public.pem
+    python bulk_crypto.py verify encrypted/ --private-key bob_private.pem --peer-public-key alice_public.pem
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import threading
+import time
+
+from crypto_modules import ECCManager, ECDHManager, AESManager, IntegrityManager
+from crypto_modules.aes_module import PackageStream, STREAM_CHUNK_SIZE
+
+MANIFEST_FILENAME = '.bulk_manifest.jsonl'
+ENCRYPTED_SUFFIX = '.enc'
+
+
+def derive_session_keys(private_key_file, peer_public_key_file):
+    """Run ECDH once on PEM files and return the session key hierarchy (SessionKeys)"""
+    ecc_manager = ECCManager()
+    ecdh_manager = ECDHManager()
+    private_key = ecc_manager.load_private_key(private_key_file)
+    peer_public_key = ecc_manager.load_public_key(peer_public_key_file)
+    return ecdh_manager.derive_session_keys(private_key, peer_public_key)['session_keys']
+
+
+def matches(rel_path, patterns):
+    """Match a relative POSIX path (or its basename) against glob patterns"""
+    name = rel_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def iter_files(source_dir, include, exclude, skip_dirs=()):
+    """
+    Walk source_dir in a stable order
+    Yields: (absolute path, relative POSIX path)
+    """
+    skip_dirs = {os.path.realpath(path) for path in skip_dirs}
+    for root, dirnames, filenames in os.walk(source_dir):
+        rel_root = os.path.relpath(root, source_dir).replace(os.sep, '/')
+        rel_root = '' if rel_root == '.' else rel_root + '/'
+        dirnames[:] = sorted(
+            dirname for dirname in dirnames
+            if os.path.realpath(os.path.join(root, dirname)) not in skip_dirs
+            and not matches(rel_root + dirname, exclude)
+        )
+        for filename in sorted(filenames):
+            rel_path = rel_root + filename
+            if filename == MANIFEST_FILENAME:
+                continue
+            if include and not matches(rel_path, include):
+                continue
+            if matches(rel_path, exclude):
+                continue
+            yield os.path.join(root, filename), rel_path
+
+
+class Manifest:
+    """Append-only record of completed files, used to resume interrupted runs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by an interrupted run
+                    self.completed[entry['path']] = (entry['size'], entry['mtime_ns'])
+
+        self._file = open(path, 'a')
+
+    def is_done(self, rel_path, stat):
+        return self.completed.get(rel_path) == (stat.st_size, stat.st_mtime_ns)
+
+    def mark_done(self, rel_path, stat, output):
+        line = json.dumps({
+            'path': rel_path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'output': output
+        })
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BulkProcessor:
+    def __init__(self, command, session_keys, source_dir, dest_dir, workers=None, include=None,
+                 exclude=None, manifest_path=None, chunk_size=STREAM_CHUNK_SIZE, quiet=False):
+        """
+        Initialize Bulk Processor
+        Args:
+            command: 'encrypt' or 'decrypt'
+            session_keys: SessionKeys; each file gets its own subkey
+            source_dir: Directory tree to process
+            dest_dir: Directory for outputs (mirrors the source tree)
+            workers: Number of worker threads
+            include, exclude: Glob patterns on relative paths
+            manifest_path: Resume manifest (default: dest_dir/.bulk_manifest.jsonl)
+            chunk_size: Read size in bytes
+            quiet: Suppress progress output
+        """
+        self.command = command
+        self.session_keys = session_keys
+        self.source_dir = source_dir
+        self.dest_dir = dest_dir
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.include = include or ([f'*{ENCRYPTED_SUFFIX}'] if command == 'decrypt' else [])
+        self.exclude = exclude or []
+        self.manifest_path = manifest_path or os.path.join(dest_dir, MANIFEST_FILENAME)
+        self.chunk_size = chunk_size
+        self.quiet = quiet
+        self.aes_manager = AESManager()
+
+        self.stats = {'processed': 0, 'skipped': 0, 'failed': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self.failures = []
+        self._stats_lock = threading.Lock()
+
+    def output_path(self, rel_path):
+        if self.command == 'encrypt':
+            rel_output = rel_path + ENCRYPTED_SUFFIX
+        elif rel_path.endswith(ENCRYPTED_SUFFIX):
+            rel_output = rel_path[:-len(ENCRYPTED_SUFFIX)]
+        else:
+            rel_output = rel_path + '.dec'
+        return os.path.join(self.dest_dir, *rel_output.split('/')), rel_output
+
+    def _record_failure(self, rel_path, error):
+        with self._stats_lock:
+            self.stats['failed'] += 1
+            self.failures.append({'path': rel_path, 'error': str(error) or type(error).__name__})
+
+    def process_file(self, path, rel_path, stat, manifest):
+        output_path, rel_output = self.output_path(rel_path)
+
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            if self.command == 'encrypt':
+                aes_key, key_header = self.session_keys.new_file_key()
+                result = self.aes_manager.encrypt_file_gcm_stream(
+                    path, aes_key, output_path, self.chunk_size, header=key_header
+                )
+                bytes_out = result['encrypted_size']
+            else:
+                with PackageStream(path, self.chunk_size) as stream:
+                    is_cbc = 'iv' in stream.header
+                if is_cbc:
+                    result = self.aes_manager.decrypt_file_cbc(
+                        path, self.session_keys.key_for_header, output_path
+                    )
+                else:
+                    result = self.aes_manager.decrypt_file_gcm_stream(
+                        path, self.session_keys.key_for_header, output_path, self.chunk_size
+                    )
+                if not result['success']:
+                    raise ValueError(result['error'])
+                bytes_out = result['decrypted_size']
+            manifest.mark_done(rel_path, stat, rel_output)
+        except Exception as e:
+            self._record_failure(rel_path, e)
+            return
+
+        with self._stats_lock:
+            self.stats['processed'] += 1
+            self.stats['bytes_in'] += stat.st_size
+            self.stats['bytes_out'] += bytes_out
+
+    def _progress(self, start_time):
+        if self.quiet:
+            return
+        elapsed = time.time() - start_time
+        done = self.stats['processed'] + self.stats['failed']
+        print(f"\r{done} files, {self.stats['bytes_in'] / 1024 ** 2:.1f} MB, "
+              f"{self.stats['skipped']} skipped, {self.stats['failed']} failed, {elapsed:.1f}s",
+              end='', file=sys.stderr, flush=True)
+
+    def run(self):
+        """
+        Process the tree with a bounded worker pool
+        Returns: summary dict
+        """
+        start_time = time.time()
+        os.makedirs(self.dest_dir, exist_ok=True)
+        manifest = Manifest(self.manifest_path)
+
+        # Keep a bounded number of files in flight so millions of files are
+        # never materialized as futures up front
+        max_in_flight = self.workers * 4
+        files = iter_files(self.source_dir, self.include, self.exclude, skip_dirs=[self.dest_dir])
+        last_progress = start_time
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                in_flight = {}
+                exhausted = False
+                while in_flight or not exhausted:
+                    while not exhausted and len(in_flight) < max_in_flight:
+                        item = next(files, None)
+                        if item is None:
+                            exhausted = True
+                            break
+                        path, rel_path = item
+                        try:
+                            stat = os.stat(path)
+                        except OSError as e:
+                            # Dangling symlinks or files removed during the walk
+                            self._record_failure(rel_path, e)
+                            continue
+                        if manifest.is_done(rel_path, stat) and os.path.exists(self.output_path(rel_path)[0]):
+                            self.stats['skipped'] += 1
+                            continue
+                        future = executor.submit(self.process_file, path, rel_path, stat, manifest)
+                        in_flight[future] = rel_path
+
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        rel_path = in_flight.pop(future)
+                        # process_file records its own failures; anything that
+                        # escapes it must still count, never be dropped
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self._record_failure(rel_path, e)
+
+                    if time.time() - last_progress >= 1:
+                        last_progress = time.time()
+                        self._progress(start_time)
+        finally:
+            manifest.close()
+
+        self._progress(start_time)
+        if not self.quiet:
+            print(file=sys.stderr)
+
+        elapsed = time.time() - start_time
+        return {
+            'command': self.command,
+            'elapsed_time': elapsed,
+            'workers': self.workers,
+            **self.stats,
+            'throughput_mb_s': (self.stats['bytes_in'] / 1024 ** 2) / elapsed if elapsed else 0,
+            'files_per_second': self.stats['processed'] / elapsed if elapsed else 0,
+            'failures': self.failures
+        }
+
+
+def print_summary(summary):
+    print(f"{summary['command'].capitalize()}ed {summary['processed']} files "
+          f"({summary['bytes_in'] / 1024 ** 2:.2f} MB in, {summary['bytes_out'] / 1024 ** 2:.2f} MB out) "
+          f"in {summary['elapsed_time']:.2f}s with {summary['workers']} workers")
+    print(f"Throughput: {summary['throughput_mb_s']:.2f} MB/s, {summary['files_per_second']:.1f} files/s")
+    print(f"Skipped (already done): {summary['skipped']}, failed: {summary['failed']}")
+    for failure in summary['failures'][:20]:
+        print(f"  FAILED {failure['path']}: {failure['error']}")
+    if len(summary['failures']) > 20:
+        print(f"  ... and {len(summary['failures']) - 20} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk directory encryption for Hybrid ECC-AES192')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(subparser):
+        subparser.add_argument('--private-key', required=True, help='Own private key (PEM)')
+        subparser.add_argument('--peer-public-key', required=True, help="Peer's public key (PEM)")
+        subparser.add_argument('--workers', type=int, help='Worker threads (default: CPU count + 4, max 32)')
+        subparser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE, help='Read size in bytes')
+        subparser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    for command in ('encrypt', 'decrypt'):
+        subparser = subparsers.add_parser(command, help=f'{command.capitalize()} a directory tree')
+        subparser.add_argument('source', help='Source directory')
+        subparser.add_argument('dest', help='Destination directory')
+        subparser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                               help='Only process matching paths (repeatable)')
+        subparser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                               help='Skip matching paths and directories (repeatable)')
+        subparser.add_argument('--manifest', help=f'Resume manifest (default: DEST/{MANIFEST_FILENAME})')
+        subparser.add_argument('--quiet', action='store_true', help='No progress output')
+        add_common(subparser)
+
+    subparser = subparsers.add_parser('verify', help='Verify GCM packages without writing plaintext')
+    subparser.add_argument('source', help='Directory with encrypted packages')
+    subparser.add_argument('--pattern', default=f'*{ENCRYPTED_SUFFIX}', help='Package filename glob')
+    add_common(subparser)
+
+    args = parser.parse_args(argv)
+    session_keys = derive_session_keys(args.private_key, args.peer_public_key)
+
+    if args.command == 'verify':
+        integrity_manager = IntegrityManager(workers=args.workers, chunk_size=args.chunk_size)
+        report = integrity_manager.scan_directory(args.source, session_keys.key_for_header, pattern=args.pattern)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(f"Scanned {report['files_scanned']} files ({report['bytes_scanned'] / 1024 ** 2:.2f} MB) "
+                  f"in {report['scan_time']:.2f}s, {report['throughput_mb_s']:.2f} MB/s")
+            print(f"ok: {report['ok_count']}, corrupt: {report['corrupt_count']}, "
+                  f"truncated: {report['truncated_count']}, unsupported: {report['unsupported_count']}, "
+                  f"error: {report['error_count']}")
+            for problem in report['problems']:
+                print(f"  {problem['status'].upper()} {problem['encrypted_file_path']}: {problem['error']}")
+        return 0 if report['all_intact'] else 1
+
+    processor = BulkProcessor(
+        args.command, session_keys, args.source, args.dest,
+        workers=args.workers,
+        include=args.include,
+        exclude=args.exclude,
+        manifest_path=args.manifest,
+        chunk_size=args.chunk_size,
+        quiet=args.quiet or args.json
+    )
+    summary = processor.run()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
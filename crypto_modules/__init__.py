@@ -1,9 +1,30 @@
 """
 Crypto Modules Package for Hybrid ECC-AES192 System
+Managers are imported on first access, so importing the package does not
+load the cryptography stack until it is needed
 """
 
-from .ecc_module import ECCManager
-from .ecdh_module import ECDHManager
-from .aes_module import AESManager
+import importlib
 
-__all__ = ['ECCManager', 'ECDHManager', 'AESManager']
+_EXPORTS = {
+    'ECCManager': '.ecc_module',
+    'ECDHManager': '.ecdh_module',
+    'SessionKeys': '.ecdh_module',
+    'AESManager': '.aes_module',
+    'IntegrityManager': '.integrity_module',
+    'BundleManager': '.bundle_module',
+    'MemoryProfiler': '.profiling_module',
+    'MetricsStore': '.metrics_module'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -6,23 +6,150 @@ Handles AES-192 encryption and decryption
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidTag
 import os
+import re
 import time
 import json
 import base64
+import binascii
+
+# Read size used when streaming packages from disk
+STREAM_CHUNK_SIZE = 256 * 1024
+
+_CIPHERTEXT_KEY = re.compile(rb'"ciphertext"\s*:\s*"')
+
+# The fields before the ciphertext are small; a package without the
+# ciphertext key in this many bytes is treated as corrupt
+MAX_HEADER_SIZE = 64 * 1024
+
+# Bytes of the previous read searched again, so a key split across reads is found
+_KEY_OVERLAP = 64
+
+
+class PackageFormatError(ValueError):
+    """Raised when an encrypted package is not valid JSON package data"""
+
+
+class PackageTruncatedError(PackageFormatError):
+    """Raised when an encrypted package ends before it is complete"""
+
+
+class PackageStream:
+    """
+    Streaming reader for JSON encrypted packages
+    Yields the Base64 ciphertext as decoded chunks so a package never has to
+    be held in memory; the small metadata fields are parsed separately
+    """
+
+    def __init__(self, encrypted_file_path, chunk_size=STREAM_CHUNK_SIZE):
+        self.path = encrypted_file_path
+        self.chunk_size = chunk_size
+        self.header = {}
+        self.metadata = None
+        self.ciphertext_size = 0
+        self._file = open(encrypted_file_path, 'rb')
+        self._head = b''
+        self._pending = b''
+        self._read_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _read_header(self):
+        """Read up to the opening quote of the ciphertext value"""
+        buffer = b''
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            # Only search the new bytes, so damaged packages are not rescanned per read
+            start = max(len(buffer) - _KEY_OVERLAP, 0)
+            buffer += chunk
+            match = _CIPHERTEXT_KEY.search(buffer, start)
+            if match:
+                break
+            if not chunk:
+                if buffer.lstrip().startswith(b'{') and not buffer.rstrip().endswith(b'}'):
+                    raise PackageTruncatedError('Package ends before ciphertext')
+                raise PackageFormatError('Package has no ciphertext field')
+            if len(buffer) > MAX_HEADER_SIZE:
+                raise PackageFormatError(f'No ciphertext field in the first {MAX_HEADER_SIZE} bytes')
+
+        self._head = buffer[:match.start()]
+        self._pending = buffer[match.end():]
+
+        # Fields written before the ciphertext (nonce, tag, iv, ...) are
+        # available up front; close the partial object to parse them
+        try:
+            self.header = json.loads(self._head.rstrip().rstrip(b',') + b'}')
+        except ValueError as e:
+            raise PackageFormatError(f'Invalid package header: {e}') from e
+
+    def iter_ciphertext(self, decode=True):
+        """
+        Iterate over the ciphertext
+        Args:
+            decode: yield decoded bytes (False only scans to the end)
+        Yields: ciphertext chunks
+        """
+        remainder = b''
+        data = self._pending
+        self._pending = b''
+        while True:
+            end = data.find(b'"')
+            text = data if end == -1 else data[:end]
+
+            if decode:
+                text = remainder + text
+                usable = len(text) - len(text) % 4
+                remainder = text[usable:]
+                if usable:
+                    try:
+                        chunk = base64.b64decode(text[:usable], validate=True)
+                    except binascii.Error as e:
+                        raise PackageFormatError(f'Invalid ciphertext encoding: {e}') from e
+                    self.ciphertext_size += len(chunk)
+                    yield chunk
+
+            if end != -1:
+                if remainder:
+                    raise PackageFormatError('Ciphertext length is not a multiple of 4')
+                self._read_metadata(data[end + 1:])
+                return
+
+            data = self._file.read(self.chunk_size)
+            if not data:
+                raise PackageTruncatedError('Package ends inside ciphertext')
+
+    def _read_metadata(self, tail):
+        """Parse every field except the ciphertext from the package"""
+        tail += self._file.read()
+        try:
+            self.metadata = json.loads(self._head + b'"ciphertext": ""' + tail)
+        except ValueError as e:
+            if not tail.rstrip().endswith(b'}'):
+                raise PackageTruncatedError('Package ends after ciphertext') from e
+            raise PackageFormatError(f'Invalid package metadata: {e}') from e
+
 
 class AESManager:
     def __init__(self):
         """Initialize AES Manager"""
         self.backend = default_backend()
     
-    def encrypt_file_gcm(self, file_path, aes_key, output_path=None):
+    def encrypt_file_gcm(self, file_path, aes_key, output_path=None, header=None):
         """
         Encrypt file using AES-192-GCM
         Args:
             file_path: Path to input file
             aes_key: 24-byte AES-192 key
             output_path: Path for encrypted file (optional)
+            header: Extra package fields, e.g. key derivation parameters (optional)
         Returns:
             dict with encryption results
         """
@@ -53,6 +180,7 @@ class AESManager:
         encrypted_package = {
             'nonce': base64.b64encode(nonce).decode('utf-8'),
             'tag': base64.b64encode(tag).decode('utf-8'),
+            **(header or {}),
             'ciphertext': base64.b64encode(encrypted_data).decode('utf-8'),
             'algorithm': 'AES-192-GCM',
             'original_filename': os.path.basename(file_path)
@@ -83,7 +211,8 @@ class AESManager:
         Decrypt file using AES-192-GCM
         Args:
             encrypted_file_path: Path to encrypted file
-            aes_key: 24-byte AES-192 key
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for the package header (see SessionKeys.key_for_header)
             output_path: Path for decrypted file (optional)
         Returns:
             dict with decryption results
@@ -95,6 +224,7 @@ class AESManager:
             encrypted_package = json.load(f)
         
         # Extract components
+        aes_key = self._resolve_key(aes_key, encrypted_package)
         nonce = base64.b64decode(encrypted_package['nonce'])
         tag = base64.b64decode(encrypted_package['tag'])
         ciphertext = base64.b64decode(encrypted_package['ciphertext'])
@@ -139,13 +269,259 @@ class AESManager:
                 'error': str(e)
             }
     
-    def encrypt_file_cbc(self, file_path, aes_key, output_path=None):
+    def encrypt_file_gcm_stream(self, file_path, aes_key, output_path=None, chunk_size=STREAM_CHUNK_SIZE,
+                                header=None):
+        """
+        Encrypt file using AES-192-GCM without loading it into memory
+        Produces the same JSON package as encrypt_file_gcm, with the tag
+        written after the ciphertext
+        Args:
+            file_path: Path to input file
+            aes_key: 24-byte AES-192 key
+            output_path: Path for encrypted file (optional)
+            chunk_size: Read size in bytes
+            header: Extra package fields, e.g. key derivation parameters (optional)
+        Returns:
+            dict with encryption results
+        """
+        start_time = time.time()
+        
+        # Base64 encodes 3-byte groups, so whole-multiple chunks need no padding
+        chunk_size = max(chunk_size - chunk_size % 3, 3)
+        
+        nonce = os.urandom(12)
+        encryptor = Cipher(
+            algorithms.AES(aes_key),
+            modes.GCM(nonce),
+            backend=self.backend
+        ).encryptor()
+        
+        if output_path is None:
+            output_path = file_path + '.enc'
+        partial_path = output_path + '.part'
+        
+        original_size = 0
+        try:
+            with open(file_path, 'rb') as f, open(partial_path, 'wb') as out:
+                out.write(
+                    b'{\n'
+                    b'  "nonce": "' + base64.b64encode(nonce) + b'",\n'
+                    b'  "algorithm": "AES-192-GCM",\n'
+                    b'  "original_filename": ' + json.dumps(os.path.basename(file_path)).encode('utf-8') + b',\n'
+                )
+                for name, value in (header or {}).items():
+                    out.write(b'  ' + json.dumps(name).encode('utf-8') + b': ' + json.dumps(value).encode('utf-8') + b',\n')
+                out.write(b'  "ciphertext": "')
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    original_size += len(chunk)
+                    out.write(base64.b64encode(encryptor.update(chunk)))
+                encryptor.finalize()
+                tag = encryptor.tag
+                out.write(b'",\n  "tag": "' + base64.b64encode(tag) + b'"\n}')
+            os.replace(partial_path, output_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        
+        encryption_time = time.time() - start_time
+        encrypted_size = os.path.getsize(output_path)
+        
+        return {
+            'encrypted_file_path': output_path,
+            'encryption_time': encryption_time,
+            'original_size': original_size,
+            'encrypted_size': encrypted_size,
+            'nonce': base64.b64encode(nonce).decode('utf-8'),
+            'tag': base64.b64encode(tag).decode('utf-8'),
+            'size_increase': encrypted_size - original_size,
+            'size_increase_percent': ((encrypted_size - original_size) / original_size) * 100 if original_size else 0
+        }
+    
+    def decrypt_file_gcm_stream(self, encrypted_file_path, aes_key, output_path=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Decrypt file using AES-192-GCM without loading it into memory
+        The plaintext only replaces output_path once the tag has verified
+        Args:
+            encrypted_file_path: Path to encrypted file
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for the package header (see SessionKeys.key_for_header)
+            output_path: Path for decrypted file (optional)
+            chunk_size: Read size in bytes
+        Returns:
+            dict with decryption results
+        """
+        start_time = time.time()
+        partial_path = (output_path or encrypted_file_path + '.dec') + '.part'
+        
+        try:
+            with PackageStream(encrypted_file_path, chunk_size) as stream:
+                aes_key = self._resolve_key(aes_key, stream.header)
+                if 'nonce' not in stream.header:
+                    # Packages with the nonce after the ciphertext cannot be streamed
+                    stream.close()
+                    return self.decrypt_file_gcm(encrypted_file_path, aes_key, output_path)
+                
+                decryptor = Cipher(
+                    algorithms.AES(aes_key),
+                    modes.GCM(base64.b64decode(stream.header['nonce'])),
+                    backend=self.backend
+                ).decryptor()
+                
+                decrypted_size = 0
+                with open(partial_path, 'wb') as out:
+                    for chunk in stream.iter_ciphertext():
+                        decrypted_size += len(chunk)
+                        out.write(decryptor.update(chunk))
+                    metadata = stream.metadata
+                    out.write(decryptor.finalize_with_tag(base64.b64decode(metadata['tag'])))
+            
+            if output_path is None:
+                output_path = metadata.get('original_filename', 'decrypted_file')
+            os.replace(partial_path, output_path)
+            
+            decryption_time = time.time() - start_time
+            
+            return {
+                'decrypted_file_path': output_path,
+                'decryption_time': decryption_time,
+                'original_encrypted_size': os.path.getsize(encrypted_file_path),
+                'decrypted_size': decrypted_size,
+                'success': True,
+                'error': None
+            }
+        
+        except Exception as e:
+            decryption_time = time.time() - start_time
+            return {
+                'decrypted_file_path': None,
+                'decryption_time': decryption_time,
+                'success': False,
+                'error': str(e) or type(e).__name__
+            }
+        
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+    
+    def verify_file_gcm(self, encrypted_file_path, aes_key, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Verify the authentication tag of an AES-192-GCM package without
+        writing the plaintext anywhere
+        Args:
+            encrypted_file_path: Path to encrypted file
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for the package header (see SessionKeys.key_for_header)
+            chunk_size: Read size in bytes
+        Returns:
+            dict with verification results; status is one of
+            'ok', 'corrupt', 'truncated', 'unsupported' or 'error'
+        """
+        start_time = time.time()
+        metadata = {}
+        ciphertext_size = 0
+        
+        try:
+            with PackageStream(encrypted_file_path, chunk_size) as stream:
+                if 'iv' in stream.header:
+                    # CBC has no tag; classify it without reading the ciphertext
+                    return self._verification_result(
+                        encrypted_file_path, start_time, dict(stream.header, algorithm='AES-192-CBC'),
+                        0, 'unsupported', 'Cannot authenticate AES-192-CBC packages'
+                    )
+                aes_key = self._resolve_key(aes_key, stream.header)
+                nonce = stream.header.get('nonce')
+                if nonce is not None:
+                    decryptor = self._authenticate_gcm_stream(stream, aes_key, nonce, chunk_size)
+                else:
+                    # The nonce is written after the ciphertext (or missing);
+                    # scan past the ciphertext once to read the trailing fields
+                    for _ in stream.iter_ciphertext(decode=False):
+                        pass
+                metadata = stream.metadata
+                ciphertext_size = stream.ciphertext_size
+            
+            if metadata.get('algorithm', 'AES-192-GCM') != 'AES-192-GCM' or 'nonce' not in metadata:
+                return self._verification_result(
+                    encrypted_file_path, start_time, metadata, ciphertext_size, 'unsupported',
+                    f"Cannot authenticate {metadata.get('algorithm', 'unknown')} packages"
+                )
+            
+            if nonce is None:
+                with PackageStream(encrypted_file_path, chunk_size) as stream:
+                    decryptor = self._authenticate_gcm_stream(
+                        stream, aes_key, metadata['nonce'], chunk_size
+                    )
+                    ciphertext_size = stream.ciphertext_size
+            
+            decryptor.finalize_with_tag(base64.b64decode(metadata['tag']))
+            
+            return self._verification_result(
+                encrypted_file_path, start_time, metadata, ciphertext_size, 'ok', None
+            )
+        
+        except PackageTruncatedError as e:
+            status, error = 'truncated', str(e)
+        except InvalidTag:
+            status, error = 'corrupt', 'Authentication tag mismatch (corrupted data or wrong key)'
+        except (PackageFormatError, KeyError, binascii.Error, ValueError) as e:
+            status, error = 'corrupt', f'{type(e).__name__}: {e}'
+        except Exception as e:
+            status, error = 'error', str(e)
+        
+        return self._verification_result(
+            encrypted_file_path, start_time, metadata, ciphertext_size, status, error
+        )
+    
+    def _resolve_key(self, aes_key, header):
+        """AES key for a package: aes_key itself, or its result for the header"""
+        return aes_key(header) if callable(aes_key) else aes_key
+    
+    def _authenticate_gcm_stream(self, stream, aes_key, nonce, chunk_size):
+        """
+        Feed a package's ciphertext through a GCM decryptor, discarding the
+        plaintext into one reusable buffer
+        Returns: decryptor ready for finalize_with_tag
+        """
+        decryptor = Cipher(
+            algorithms.AES(aes_key),
+            modes.GCM(base64.b64decode(nonce)),
+            backend=self.backend
+        ).decryptor()
+        
+        buffer = bytearray(chunk_size + 16)
+        for chunk in stream.iter_ciphertext():
+            if len(chunk) + 15 > len(buffer):
+                buffer = bytearray(len(chunk) + 16)
+            decryptor.update_into(chunk, buffer)
+        
+        return decryptor
+    
+    def _verification_result(self, encrypted_file_path, start_time, metadata,
+                             ciphertext_size, status, error):
+        """Build the result dict returned by verify_file_gcm"""
+        return {
+            'encrypted_file_path': encrypted_file_path,
+            'verification_time': time.time() - start_time,
+            'encrypted_size': os.path.getsize(encrypted_file_path) if os.path.exists(encrypted_file_path) else 0,
+            'ciphertext_size': ciphertext_size,
+            'algorithm': (metadata or {}).get('algorithm'),
+            'original_filename': (metadata or {}).get('original_filename'),
+            'status': status,
+            'success': status == 'ok',
+            'error': error
+        }
+    
+    def encrypt_file_cbc(self, file_path, aes_key, output_path=None, header=None):
         """
         Encrypt file using AES-192-CBC with PKCS7 padding
         Args:
             file_path: Path to input file
             aes_key: 24-byte AES-192 key
             output_path: Path for encrypted file (optional)
+            header: Extra package fields, e.g. key derivation parameters (optional)
         Returns:
             dict with encryption results
         """
@@ -176,6 +552,7 @@ class AESManager:
         # Prepare encrypted package
         encrypted_package = {
             'iv': base64.b64encode(iv).decode('utf-8'),
+            **(header or {}),
             'ciphertext': base64.b64encode(encrypted_data).decode('utf-8'),
             'algorithm': 'AES-192-CBC',
             'padding': 'PKCS7',
@@ -206,7 +583,8 @@ class AESManager:
         Decrypt file using AES-192-CBC with PKCS7 padding
         Args:
             encrypted_file_path: Path to encrypted file
-            aes_key: 24-byte AES-192 key
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for the package header (see SessionKeys.key_for_header)
             output_path: Path for decrypted file (optional)
         Returns:
             dict with decryption results
@@ -218,6 +596,7 @@ class AESManager:
             encrypted_package = json.load(f)
         
         # Extract components
+        aes_key = self._resolve_key(aes_key, encrypted_package)
         iv = base64.b64decode(encrypted_package['iv'])
         ciphertext = base64.b64decode(encrypted_package['ciphertext'])
         original_filename = encrypted_package.get('original_filename', 'decrypted_file')
@@ -0,0 +1,360 @@
+"""
+Bundle Module for Hybrid ECC-AES192 System
+Packs many files into one AES-192-GCM encrypted container
+
+Container layout:
+    header   MAGIC | bundle_id (16 bytes) | fields_length (2 bytes) | JSON fields
+    members  raw GCM ciphertext of each member, back to back
+    index    nonce (12 bytes) | GCM ciphertext of the JSON index | tag (16 bytes)
+    footer   index_offset (8 bytes) | index_length (8 bytes) | MAGIC
+
+Every member has its own nonce and tag (stored in the encrypted index), so a
+single member can be listed and extracted without decrypting the rest.
+The header fields carry key derivation parameters (kdf, kdf_salt) so every
+bundle can use its own subkey; the whole header is authenticated as
+associated data of the index. Bundles written before the fields existed use
+LEGACY_BUNDLE_MAGIC and have no fields.
+"""
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.backends import default_backend
+import os
+import json
+import time
+import struct
+import posixpath
+
+from .aes_module import STREAM_CHUNK_SIZE
+
+BUNDLE_MAGIC = b'HECAB002'
+LEGACY_BUNDLE_MAGIC = b'HECAB001'
+BUNDLE_EXTENSION = '.bundle'
+
+_HEADER = struct.Struct('>8s16s')
+_FIELDS_LENGTH = struct.Struct('>H')
+_FOOTER = struct.Struct('>QQ8s')
+
+class BundleManager:
+    def __init__(self, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Initialize Bundle Manager
+        Args:
+            chunk_size: Read size in bytes when streaming members
+        """
+        self.backend = default_backend()
+        self.chunk_size = chunk_size
+
+    def create_bundle(self, file_paths, aes_key, output_path, arcnames=None, header=None):
+        """
+        Encrypt many files into one container
+        Args:
+            file_paths: Paths (or readable binary file objects) of files to pack
+            aes_key: 24-byte AES-192 key
+            output_path: Path for the bundle
+            arcnames: Member names (optional for paths, default: file basenames)
+            header: Header fields, e.g. key derivation parameters (optional)
+        Returns:
+            dict with bundle results
+        """
+        start_time = time.time()
+
+        if arcnames is None:
+            arcnames = [os.path.basename(path) for path in file_paths]
+        if len(arcnames) != len(file_paths):
+            raise ValueError('arcnames must match file_paths')
+
+        names = [self._normalize_name(name) for name in arcnames]
+        if len(set(names)) != len(names):
+            raise ValueError('Duplicate member names in bundle')
+
+        bundle_id = os.urandom(16)
+        fields = json.dumps(header or {}).encode('utf-8')
+        header = _HEADER.pack(BUNDLE_MAGIC, bundle_id) + _FIELDS_LENGTH.pack(len(fields)) + fields
+        members = []
+        original_size = 0
+
+        # Build the container beside output_path so a failure never leaves a
+        # partial bundle or replaces an existing one
+        partial_path = output_path + '.part'
+        try:
+            with open(partial_path, 'wb') as out:
+                out.write(header)
+                offset = len(header)
+
+                for path, name in zip(file_paths, names):
+                    nonce = os.urandom(12)
+                    encryptor = Cipher(
+                        algorithms.AES(aes_key),
+                        modes.GCM(nonce),
+                        backend=self.backend
+                    ).encryptor()
+                    # Bind each member to this bundle and its name
+                    encryptor.authenticate_additional_data(bundle_id + name.encode('utf-8'))
+
+                    if hasattr(path, 'read'):
+                        size = self._encrypt_stream(path, encryptor, out)
+                        mtime = time.time()
+                    else:
+                        with open(path, 'rb') as f:
+                            size = self._encrypt_stream(f, encryptor, out)
+                        mtime = os.path.getmtime(path)
+                    out.write(encryptor.finalize())
+
+                    members.append({
+                        'name': name,
+                        'offset': offset,
+                        'size': size,
+                        'mtime': mtime,
+                        'nonce': nonce.hex(),
+                        'tag': encryptor.tag.hex()
+                    })
+                    offset += size
+                    original_size += size
+
+                # Encrypt the index with the header as associated data
+                index_data = json.dumps({'algorithm': 'AES-192-GCM', 'members': members}).encode('utf-8')
+                index_nonce = os.urandom(12)
+                encryptor = Cipher(
+                    algorithms.AES(aes_key),
+                    modes.GCM(index_nonce),
+                    backend=self.backend
+                ).encryptor()
+                encryptor.authenticate_additional_data(header)
+                index_blob = index_nonce + encryptor.update(index_data) + encryptor.finalize() + encryptor.tag
+
+                out.write(index_blob)
+                out.write(_FOOTER.pack(offset, len(index_blob), BUNDLE_MAGIC))
+                bundle_size = offset + len(index_blob) + _FOOTER.size
+            os.replace(partial_path, output_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        creation_time = time.time() - start_time
+        size_increase = bundle_size - original_size
+
+        return {
+            'bundle_file_path': output_path,
+            'encryption_time': creation_time,
+            'member_count': len(members),
+            'original_size': original_size,
+            'encrypted_size': bundle_size,
+            'size_increase': size_increase,
+            'size_increase_percent': (size_increase / original_size) * 100 if original_size else 0
+        }
+
+    def create_bundle_from_directory(self, directory, aes_key, output_path, header=None):
+        """
+        Encrypt every file below a directory into one container
+        Member names are paths relative to the directory
+        """
+        file_paths = []
+        arcnames = []
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(root, filename)
+                file_paths.append(path)
+                arcnames.append(os.path.relpath(path, directory))
+
+        return self.create_bundle(file_paths, aes_key, output_path, arcnames, header)
+
+    def list_bundle(self, bundle_path, aes_key):
+        """
+        List bundle members by decrypting only the index
+        Args:
+            bundle_path: Path to bundle
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for the header fields (see SessionKeys.key_for_header)
+        Returns:
+            dict with member names, sizes and modification times
+        """
+        start_time = time.time()
+
+        try:
+            with open(bundle_path, 'rb') as f:
+                _, members, _ = self._read_index(f, aes_key)
+
+            return {
+                'members': [
+                    {'name': member['name'], 'size': member['size'], 'mtime': member['mtime']}
+                    for member in members
+                ],
+                'member_count': len(members),
+                'total_size': sum(member['size'] for member in members),
+                'listing_time': time.time() - start_time,
+                'success': True,
+                'error': None
+            }
+
+        except Exception as e:
+            return {
+                'members': [],
+                'listing_time': time.time() - start_time,
+                'success': False,
+                'error': str(e) or type(e).__name__
+            }
+
+    def extract_member(self, bundle_path, aes_key, name, output_path=None):
+        """
+        Decrypt a single member without touching the others
+        Args:
+            bundle_path: Path to bundle
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for the header fields (see SessionKeys.key_for_header)
+            name: Member name
+            output_path: Path for decrypted file (optional, default: member basename)
+        Returns:
+            dict with decryption results
+        """
+        start_time = time.time()
+
+        try:
+            with open(bundle_path, 'rb') as f:
+                bundle_id, members, aes_key = self._read_index(f, aes_key)
+                member = next((m for m in members if m['name'] == name), None)
+                if member is None:
+                    raise ValueError(f'No member named {name!r} in bundle')
+
+                if output_path is None:
+                    output_path = posixpath.basename(member['name'])
+                self._extract(f, aes_key, bundle_id, member, output_path)
+
+            return {
+                'decrypted_file_path': output_path,
+                'decryption_time': time.time() - start_time,
+                'decrypted_size': member['size'],
+                'success': True,
+                'error': None
+            }
+
+        except Exception as e:
+            return {
+                'decrypted_file_path': None,
+                'decryption_time': time.time() - start_time,
+                'success': False,
+                'error': str(e) or type(e).__name__
+            }
+
+    def extract_all(self, bundle_path, aes_key, output_dir):
+        """
+        Decrypt every member into output_dir, recreating member paths
+        aes_key may be a callable, as in extract_member
+        Returns:
+            dict with decryption results
+        """
+        start_time = time.time()
+
+        try:
+            with open(bundle_path, 'rb') as f:
+                bundle_id, members, aes_key = self._read_index(f, aes_key)
+                for member in members:
+                    output_path = os.path.join(output_dir, *member['name'].split('/'))
+                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    self._extract(f, aes_key, bundle_id, member, output_path)
+
+            return {
+                'output_dir': output_dir,
+                'decryption_time': time.time() - start_time,
+                'member_count': len(members),
+                'decrypted_size': sum(member['size'] for member in members),
+                'success': True,
+                'error': None
+            }
+
+        except Exception as e:
+            return {
+                'output_dir': None,
+                'decryption_time': time.time() - start_time,
+                'success': False,
+                'error': str(e) or type(e).__name__
+            }
+
+    def _encrypt_stream(self, f, encryptor, out):
+        """Encrypt a readable file object into out, returns plaintext size"""
+        size = 0
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                return size
+            size += len(chunk)
+            out.write(encryptor.update(chunk))
+
+    def _read_index(self, f, aes_key):
+        """
+        Read and decrypt the bundle index
+        Returns: (bundle_id, members, aes_key) with aes_key resolved for
+        the header fields
+        """
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError('Not a bundle file (truncated header)')
+        magic, bundle_id = _HEADER.unpack(header)
+        if magic == BUNDLE_MAGIC:
+            length = f.read(_FIELDS_LENGTH.size)
+            if len(length) != _FIELDS_LENGTH.size:
+                raise ValueError('Not a bundle file (truncated header)')
+            fields = f.read(_FIELDS_LENGTH.unpack(length)[0])
+            header += length + fields
+            fields = json.loads(fields)
+        elif magic == LEGACY_BUNDLE_MAGIC:
+            fields = {}
+        else:
+            raise ValueError('Not a bundle file')
+        if callable(aes_key):
+            aes_key = aes_key(fields)
+
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        if file_size < len(header) + _FOOTER.size:
+            raise ValueError('Bundle is truncated')
+        f.seek(file_size - _FOOTER.size)
+        index_offset, index_length, footer_magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if footer_magic != magic or index_offset + index_length + _FOOTER.size != file_size:
+            raise ValueError('Bundle is truncated or corrupted')
+
+        f.seek(index_offset)
+        index_blob = f.read(index_length)
+        decryptor = Cipher(
+            algorithms.AES(aes_key),
+            modes.GCM(index_blob[:12], index_blob[-16:]),
+            backend=self.backend
+        ).decryptor()
+        decryptor.authenticate_additional_data(header)
+        index = json.loads(decryptor.update(index_blob[12:-16]) + decryptor.finalize())
+
+        return bundle_id, index['members'], aes_key
+
+    def _extract(self, f, aes_key, bundle_id, member, output_path):
+        """Stream one member to output_path, only keeping it if the tag verifies"""
+        decryptor = Cipher(
+            algorithms.AES(aes_key),
+            modes.GCM(bytes.fromhex(member['nonce']), bytes.fromhex(member['tag'])),
+            backend=self.backend
+        ).decryptor()
+        decryptor.authenticate_additional_data(bundle_id + member['name'].encode('utf-8'))
+
+        partial_path = output_path + '.part'
+        try:
+            f.seek(member['offset'])
+            remaining = member['size']
+            with open(partial_path, 'wb') as out:
+                while remaining:
+                    chunk = f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        raise ValueError('Bundle is truncated')
+                    remaining -= len(chunk)
+                    out.write(decryptor.update(chunk))
+                out.write(decryptor.finalize())
+            os.replace(partial_path, output_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    @staticmethod
+    def _normalize_name(name):
+        """Normalize a member name to a relative POSIX path"""
+        name = posixpath.normpath(name.replace(os.sep, '/').replace('\\', '/'))
+        if name.startswith('/') or name == '.' or name.split('/')[0] == '..':
+            raise ValueError(f'Invalid member name {name!r}')
+        return name
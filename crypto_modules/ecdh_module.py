@@ -5,10 +5,122 @@ Handles Elliptic Curve Diffie-Hellman key exchange
 
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.backends import default_backend
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import base64
+import os
 import time
 
+# Exchanges handed to a worker at once in batch operations
+BATCH_CHUNK_SIZE = 256
+
+# Key hierarchy: session master key -> per-file AES-192 subkeys
+MASTER_KEY_INFO = b"Session-Master-Key"
+FILE_KEY_INFO = b"AES-192-File-Key"
+FILE_KDF = 'HKDF-SHA256'
+FILE_SALT_SIZE = 16
+
+def _load_private_key(key):
+    """Accept a private key object or PEM/DER bytes"""
+    if not isinstance(key, (bytes, str)):
+        return key
+    key = key.encode('utf-8') if isinstance(key, str) else key
+    if key.lstrip().startswith(b'-----'):
+        return serialization.load_pem_private_key(key, password=None)
+    return serialization.load_der_private_key(key, password=None)
+
+def _load_public_key(key):
+    """Accept a public key object or PEM/DER bytes"""
+    if not isinstance(key, (bytes, str)):
+        return key
+    key = key.encode('utf-8') if isinstance(key, str) else key
+    if key.lstrip().startswith(b'-----'):
+        return serialization.load_pem_public_key(key)
+    return serialization.load_der_public_key(key)
+
+def _exchange_chunk(private_key, peer_public_keys, derive_key, salt, info, include_timing):
+    """
+    Run ECDH (and optionally HKDF) for one private key against many peers
+    Module-level so it can run in a process pool
+    Returns: (keys, errors, timings) with errors keyed by position in the chunk
+    """
+    private_key = _load_private_key(private_key)
+    ecdh = ec.ECDH()
+    algorithm = hashes.SHA256()
+    keys = []
+    errors = {}
+    timings = [] if include_timing else None
+    
+    for position, peer_public_key in enumerate(peer_public_keys):
+        start_time = time.perf_counter() if include_timing else 0
+        try:
+            key = private_key.exchange(ecdh, _load_public_key(peer_public_key))
+            if derive_key:
+                key = HKDF(algorithm=algorithm, length=24, salt=salt, info=info).derive(key)
+            keys.append(key)
+        except Exception as e:
+            keys.append(None)
+            errors[position] = str(e.args[0]) if e.args else type(e).__name__
+        if include_timing:
+            timings.append(time.perf_counter() - start_time)
+    
+    return keys, errors, timings
+
+def _derive_file_key(master_key, salt):
+    """HKDF a 24-byte file subkey from the session master key and a file salt"""
+    return HKDF(algorithm=hashes.SHA256(), length=24, salt=salt, info=FILE_KEY_INFO).derive(master_key)
+
+class SessionKeys:
+    """
+    Key hierarchy of one key exchange
+    The master key is derived from the ECDH shared secret once; each file is
+    encrypted under its own subkey, derived from the master key and a random
+    salt stored in the package header, so ECDH is not repeated per file and
+    random GCM nonces are never shared between many files under one key
+    """
+
+    def __init__(self, master_key, session_key=None):
+        """
+        Args:
+            master_key: 32-byte session master key
+            session_key: Single session AES key from derive_aes_key, for
+                packages written before per-file subkeys (optional)
+        """
+        self.master_key = master_key
+        self.session_key = session_key
+
+    def file_key(self, salt):
+        """Subkey for a file salt"""
+        return _derive_file_key(self.master_key, salt)
+
+    def file_keys(self, salts):
+        """Subkeys for many file salts, in order"""
+        return [_derive_file_key(self.master_key, salt) for salt in salts]
+
+    def new_file_key(self):
+        """
+        Subkey for a new file
+        Returns: (aes_key, header) where header holds the package fields
+        needed to derive the key again
+        """
+        salt = os.urandom(FILE_SALT_SIZE)
+        return self.file_key(salt), {'kdf': FILE_KDF, 'kdf_salt': base64.b64encode(salt).decode('utf-8')}
+
+    def key_for_header(self, header):
+        """
+        AES key for a package, from its header fields
+        Packages without kdf_salt use the single session key
+        """
+        salt = header.get('kdf_salt')
+        if salt is None:
+            if self.session_key is None:
+                raise ValueError('Package has no kdf_salt and no session key is available')
+            return self.session_key
+        if header.get('kdf', FILE_KDF) != FILE_KDF:
+            raise ValueError(f"Unsupported key derivation: {header['kdf']}")
+        return self.file_key(base64.b64decode(salt))
+
 class ECDHManager:
     def __init__(self):
         """Initialize ECDH Manager"""
@@ -73,6 +185,95 @@ class ECDHManager:
             'info': info
         }
     
+    def derive_session_master_key(self, shared_secret):
+        """
+        Derive the session master key that per-file subkeys come from
+        Args:
+            shared_secret: Shared secret from ECDH
+        Returns:
+            dict with master_key and derivation_time
+        """
+        start_time = time.time()
+        
+        hkdf = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=b'\x00' * 32,
+            info=MASTER_KEY_INFO,
+            backend=self.backend
+        )
+        master_key = hkdf.derive(shared_secret)
+        
+        return {
+            'master_key': master_key,
+            'derivation_time': time.time() - start_time,
+            'key_length': len(master_key) * 8  # in bits
+        }
+    
+    def derive_file_subkey(self, master_key, salt=None):
+        """
+        Derive an AES-192 subkey for one file
+        Args:
+            master_key: Session master key
+            salt: File salt (None for a new random salt)
+        Returns:
+            dict with aes_key, salt and derivation_time
+        """
+        start_time = time.time()
+        
+        if salt is None:
+            salt = os.urandom(FILE_SALT_SIZE)
+        aes_key = _derive_file_key(master_key, salt)
+        
+        return {
+            'aes_key': aes_key,
+            'salt': salt,
+            'derivation_time': time.time() - start_time,
+            'key_length': len(aes_key) * 8  # in bits
+        }
+    
+    def derive_file_subkeys(self, master_key, count=None, salts=None):
+        """
+        Derive AES-192 subkeys for many files at once
+        Args:
+            master_key: Session master key
+            count: Number of new random salts (when salts is None)
+            salts: Existing file salts to re-derive keys for
+        Returns:
+            dict with keys and salts in matching order, and derivation_time
+        """
+        start_time = time.time()
+        
+        if salts is None:
+            salts = [os.urandom(FILE_SALT_SIZE) for _ in range(count or 0)]
+        keys = SessionKeys(master_key).file_keys(salts)
+        
+        return {
+            'keys': keys,
+            'salts': list(salts),
+            'count': len(keys),
+            'derivation_time': time.time() - start_time
+        }
+    
+    def derive_session_keys(self, private_key, peer_public_key):
+        """
+        Run ECDH once and derive the session key hierarchy
+        Args:
+            private_key: Your private key
+            peer_public_key: Peer's public key
+        Returns:
+            dict with session_keys (SessionKeys) and timings
+        """
+        shared = self.compute_shared_secret(private_key, peer_public_key)
+        master = self.derive_session_master_key(shared['shared_secret'])
+        session = self.derive_aes_key(shared['shared_secret'])
+        
+        return {
+            'session_keys': SessionKeys(master['master_key'], session['aes_key']),
+            'computation_time': shared['computation_time'],
+            'derivation_time': master['derivation_time'] + session['derivation_time']
+        }
+    
     def verify_key_exchange(self, alice_private, alice_public, bob_private, bob_public):
         """
         Verify that both parties derive the same AES key
@@ -111,3 +312,123 @@ class ECDHManager:
             'total_alice_time': alice_shared['computation_time'] + alice_aes['derivation_time'],
             'total_bob_time': bob_shared['computation_time'] + bob_aes['derivation_time']
         }
+    
+    def batch_exchange(self, private_key, peer_public_keys, derive_key=True, salt=None,
+                       info=b"AES-192-Key", workers=None, use_processes=False, include_timing=False):
+        """
+        Run ECDH + HKDF for one private key against many peer public keys
+        Args:
+            private_key: Your private key (object or PEM/DER bytes)
+            peer_public_keys: Peers' public keys (objects or PEM/DER bytes)
+            derive_key: Derive AES-192 keys (False returns raw shared secrets)
+            salt, info: HKDF parameters, as in derive_aes_key
+            workers: Size of the worker pool (default: CPU count)
+            use_processes: Use a process pool instead of threads
+            include_timing: Also return per-item timings
+        Returns:
+            dict with keys (None where an exchange failed), errors by index
+            and batch timing
+        """
+        result = self.batch_exchange_matrix(
+            [private_key], peer_public_keys, derive_key, salt, info, workers, use_processes, include_timing
+        )
+        result['keys'] = result['keys'][0]
+        result['errors'] = {column: error for (_, column), error in result['errors'].items()}
+        if include_timing:
+            result['timings'] = result['timings'][0]
+        return result
+    
+    def batch_exchange_matrix(self, private_keys, peer_public_keys, derive_key=True, salt=None,
+                              info=b"AES-192-Key", workers=None, use_processes=False, include_timing=False):
+        """
+        Run ECDH + HKDF for every (private key, peer public key) combination
+        Args: see batch_exchange
+        Returns:
+            dict with keys[i][j] for private_keys[i] and peer_public_keys[j],
+            errors keyed by (i, j) and batch timing
+        """
+        start_time = time.time()
+        
+        if salt is None:
+            salt = b'\x00' * 32  # Same zero salt as derive_aes_key
+        workers = workers or os.cpu_count() or 1
+        peer_public_keys = list(peer_public_keys)
+        
+        if use_processes:
+            # Only bytes can be sent to other processes
+            private_keys = [self._private_der(key) for key in private_keys]
+            peer_public_keys = [self._public_der(key) for key in peer_public_keys]
+            executor_class = ProcessPoolExecutor
+        else:
+            private_keys = [_load_private_key(key) for key in private_keys]
+            executor_class = ThreadPoolExecutor
+        
+        chunks = [
+            (row, offset)
+            for row in range(len(private_keys))
+            for offset in range(0, len(peer_public_keys), BATCH_CHUNK_SIZE)
+        ]
+        
+        keys = [[None] * len(peer_public_keys) for _ in private_keys]
+        timings = [[0.0] * len(peer_public_keys) for _ in private_keys] if include_timing else None
+        errors = {}
+        
+        # No more workers than chunks; this is the parallelism reported
+        workers = max(1, min(workers, len(chunks)))
+        
+        if workers == 1:
+            results = [_exchange_chunk(
+                private_keys[row], peer_public_keys[offset:offset + BATCH_CHUNK_SIZE],
+                derive_key, salt, info, include_timing
+            ) for row, offset in chunks]
+        else:
+            with executor_class(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _exchange_chunk, private_keys[row], peer_public_keys[offset:offset + BATCH_CHUNK_SIZE],
+                        derive_key, salt, info, include_timing
+                    )
+                    for row, offset in chunks
+                ]
+                results = [future.result() for future in futures]
+        
+        for (row, offset), (chunk_keys, chunk_errors, chunk_timings) in zip(chunks, results):
+            keys[row][offset:offset + len(chunk_keys)] = chunk_keys
+            if include_timing:
+                timings[row][offset:offset + len(chunk_timings)] = chunk_timings
+            for position, error in chunk_errors.items():
+                errors[(row, offset + position)] = error
+        
+        batch_time = time.time() - start_time
+        
+        result = {
+            'keys': keys,
+            'errors': errors,
+            'count': len(private_keys) * len(peer_public_keys),
+            'failed': len(errors),
+            'batch_time': batch_time,
+            'workers': workers,
+            'key_length': 192 if derive_key else 256
+        }
+        if include_timing:
+            result['timings'] = timings
+        return result
+    
+    @staticmethod
+    def _private_der(key):
+        if isinstance(key, (bytes, str)):
+            return key.encode('utf-8') if isinstance(key, str) else key
+        return key.private_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+    
+    @staticmethod
+    def _public_der(key):
+        if isinstance(key, (bytes, str)):
+            return key.encode('utf-8') if isinstance(key, str) else key
+        return key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
@@ -0,0 +1,122 @@
+"""
+Integrity Module for Hybrid ECC-AES192 System
+Handles bulk verification of encrypted packages
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import fnmatch
+import os
+import time
+
+from .aes_module import AESManager, STREAM_CHUNK_SIZE
+
+class IntegrityManager:
+    def __init__(self, aes_manager=None, workers=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Initialize Integrity Manager
+        Args:
+            aes_manager: AESManager used for verification (optional)
+            workers: Number of verification threads (default: CPU count + 4, max 32)
+            chunk_size: Read size in bytes per file
+        """
+        self.aes_manager = aes_manager or AESManager()
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.chunk_size = chunk_size
+
+    def iter_packages(self, directory, pattern='*.enc', recursive=True):
+        """
+        Walk a directory for encrypted packages
+        Yields: file paths matching pattern
+        """
+        if recursive:
+            for root, _, filenames in os.walk(directory):
+                for filename in sorted(filenames):
+                    if fnmatch.fnmatch(filename, pattern):
+                        yield os.path.join(root, filename)
+        else:
+            for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+                if entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+                    yield entry.path
+
+    def verify_file(self, encrypted_file_path, aes_key):
+        """Verify a single package, see AESManager.verify_file_gcm"""
+        return self.aes_manager.verify_file_gcm(encrypted_file_path, aes_key, self.chunk_size)
+
+    def scan_directory(self, directory, aes_key, pattern='*.enc', recursive=True, include_ok=False):
+        """
+        Verify every package in a directory with a pool of worker threads
+        Args:
+            directory: Directory to scan
+            aes_key: 24-byte AES-192 key, or a callable returning the key
+                for a package header (see SessionKeys.key_for_header)
+            pattern: Filename glob for packages
+            recursive: Descend into subdirectories
+            include_ok: Include results for intact files in the report
+        Returns:
+            dict with scan report; 'problems' lists corrupt, truncated and
+            unreadable files, 'skipped' lists packages without a tag (CBC)
+            that cannot be authenticated
+        """
+        start_time = time.time()
+
+        counts = {'ok': 0, 'corrupt': 0, 'truncated': 0, 'unsupported': 0, 'error': 0}
+        problems = []
+        skipped = []
+        verified = []
+        bytes_scanned = 0
+
+        # Keep a bounded number of files in flight so huge trees are not
+        # materialized as futures up front
+        max_in_flight = self.workers * 4
+        paths = self.iter_packages(directory, pattern, recursive)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = set()
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    path = next(paths, None)
+                    if path is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(executor.submit(self.verify_file, path, aes_key))
+
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    counts[result['status']] += 1
+                    bytes_scanned += result['encrypted_size']
+                    if result['status'] == 'unsupported':
+                        skipped.append(result)
+                    elif result['status'] != 'ok':
+                        problems.append(result)
+                    elif include_ok:
+                        verified.append(result)
+
+        scan_time = time.time() - start_time
+        files_scanned = sum(counts.values())
+
+        report = {
+            'directory': directory,
+            'scan_time': scan_time,
+            'files_scanned': files_scanned,
+            'bytes_scanned': bytes_scanned,
+            'throughput_mb_s': (bytes_scanned / (1024 * 1024)) / scan_time if scan_time else 0,
+            'workers': self.workers,
+            'ok_count': counts['ok'],
+            'corrupt_count': counts['corrupt'],
+            'truncated_count': counts['truncated'],
+            'unsupported_count': counts['unsupported'],
+            'error_count': counts['error'],
+            'all_intact': not (counts['corrupt'] or counts['truncated'] or counts['error']),
+            'problems': sorted(problems, key=lambda result: result['encrypted_file_path']),
+            'skipped': sorted(skipped, key=lambda result: result['encrypted_file_path'])
+        }
+
+        if include_ok:
+            report['verified'] = sorted(verified, key=lambda result: result['encrypted_file_path'])
+
+        return report
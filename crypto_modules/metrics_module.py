@@ -0,0 +1,266 @@
+"""
+Metrics Module for Hybrid ECC-AES192 System
+Persists performance logs to an indexed SQLite database
+"""
+
+import json
+import sqlite3
+import threading
+
+# Upper bound (inclusive, bytes) of each payload size bucket
+SIZE_BUCKETS = [
+    ('0-4KB', 4 * 1024),
+    ('4KB-64KB', 64 * 1024),
+    ('64KB-1MB', 1024 * 1024),
+    ('1MB-16MB', 16 * 1024 * 1024),
+    ('16MB+', None)
+]
+
+# Operation categories used for the summary statistics
+CATEGORIES = [
+    ('key_generation', 'Key Generation'),
+    ('key_exchange', 'Key Exchange'),
+    ('encryption', 'Encryption'),
+    ('decryption', 'Decryption'),
+    ('integrity', 'Integrity')
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS performance_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    operation TEXT NOT NULL,
+    category TEXT,
+    timestamp REAL NOT NULL,
+    duration REAL,
+    payload_size INTEGER,
+    size_bucket TEXT,
+    memory_peak INTEGER,
+    rss_delta INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_performance_timestamp ON performance_logs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_performance_operation ON performance_logs (operation, timestamp);
+CREATE INDEX IF NOT EXISTS idx_performance_category ON performance_logs (category, timestamp);
+CREATE INDEX IF NOT EXISTS idx_performance_bucket ON performance_logs (size_bucket, timestamp);
+CREATE INDEX IF NOT EXISTS idx_performance_size ON performance_logs (payload_size);
+"""
+
+
+def size_bucket(size):
+    """Name of the size bucket for a payload size in bytes"""
+    if size is None:
+        return None
+    for name, upper in SIZE_BUCKETS:
+        if upper is None or size <= upper:
+            return name
+
+
+def payload_size(entry):
+    """Size in bytes of the data an operation processed, if it has one"""
+    for key in ('original_size', 'decrypted_size', 'bytes_scanned'):
+        if entry.get(key):
+            return entry[key]
+    return None
+
+
+def operation_category(operation):
+    """Category of an operation name, see CATEGORIES"""
+    for category, marker in CATEGORIES:
+        if marker in operation:
+            return category
+    return None
+
+
+def operation_duration(entry):
+    """Wall time of an operation in seconds"""
+    for key in ('total_time', 'encryption_time', 'decryption_time', 'scan_time'):
+        if key in entry:
+            return entry[key]
+    return None
+
+
+class MetricsStore:
+    def __init__(self, database='metrics.db', batch_size=100, flush_interval=2.0):
+        """
+        Initialize Metrics Store
+        Args:
+            database: SQLite database path
+            batch_size: Pending records that trigger a background flush
+            flush_interval: Maximum seconds a record waits before being written
+        """
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+
+        self._writer = threading.Thread(target=self._writer_loop, name='metrics-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, entry):
+        """Queue a performance log entry; it is written in the next batch"""
+        with self._pending_lock:
+            self._pending.append(entry)
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write all pending entries in one transaction"""
+        with self._pending_lock:
+            entries, self._pending = self._pending, []
+        if not entries:
+            return 0
+
+        rows = []
+        for entry in entries:
+            size = payload_size(entry)
+            memory = entry.get('memory') or {}
+            if memory.get('concurrent'):
+                # Overlapping samples include other requests' allocations;
+                # keep them in the entry but out of the memory statistics
+                memory = {}
+            rows.append((
+                entry['operation'],
+                operation_category(entry['operation']),
+                entry['timestamp'],
+                operation_duration(entry),
+                size,
+                size_bucket(size),
+                memory.get('tracemalloc_peak'),
+                memory.get('rss_delta'),
+                json.dumps(entry)
+            ))
+
+        with self._db_lock, self._connection:
+            self._connection.executemany(
+                'INSERT INTO performance_logs (operation, category, timestamp, duration, payload_size, '
+                'size_bucket, memory_peak, rss_delta, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # Keep the writer alive; entries of a failed batch are dropped
+
+    def close(self):
+        """Flush pending entries and close the database"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._connection.close()
+
+    def _where(self, since=None, until=None, operation=None, category=None,
+               size_bucket=None, min_size=None, max_size=None):
+        """Build a WHERE clause for the supported filters"""
+        clauses = []
+        params = []
+        for column, op, value in (
+            ('timestamp', '>=', since),
+            ('timestamp', '<=', until),
+            ('operation', '=', operation),
+            ('category', '=', category),
+            ('size_bucket', '=', size_bucket),
+            ('payload_size', '>=', min_size),
+            ('payload_size', '<=', max_size)
+        ):
+            if value is not None:
+                clauses.append(f'{column} {op} ?')
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _execute(self, sql, params):
+        # Reads see pending entries too
+        self.flush()
+        with self._db_lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def query(self, limit=500, **filters):
+        """
+        Fetch log entries matching filters, oldest first
+        Args:
+            limit: Maximum number of (most recent) entries
+            filters: since, until, operation, category, size_bucket, min_size, max_size
+        Returns:
+            list of log entry dicts
+        """
+        where, params = self._where(**filters)
+        rows = self._execute(
+            f'SELECT data FROM performance_logs{where} ORDER BY timestamp DESC LIMIT ?',
+            params + [limit]
+        )
+        return [json.loads(row['data']) for row in reversed(rows)]
+
+    def statistics(self, **filters):
+        """
+        Aggregate statistics for entries matching filters
+        Returns:
+            dict with counts and average times per category and memory
+            usage per operation
+        """
+        where, params = self._where(**filters)
+
+        statistics = {'total_operations': 0}
+        for category, _ in CATEGORIES:
+            statistics[f'{category}_count'] = 0
+            statistics[f'average_{category}_time'] = 0
+
+        rows = self._execute(
+            f'SELECT category, COUNT(*) AS count, AVG(duration) AS average_duration '
+            f'FROM performance_logs{where} GROUP BY category',
+            params
+        )
+        for row in rows:
+            statistics['total_operations'] += row['count']
+            if row['category']:
+                statistics[f"{row['category']}_count"] = row['count']
+                statistics[f"average_{row['category']}_time"] = row['average_duration'] or 0
+
+        memory_where = (where + ' AND ' if where else ' WHERE ') + 'memory_peak IS NOT NULL'
+        rows = self._execute(
+            f'SELECT operation, COUNT(*) AS samples, MAX(memory_peak) AS max_peak, '
+            f'AVG(memory_peak) AS average_peak, MAX(rss_delta) AS max_rss_delta, '
+            f'MAX(memory_peak * 1.0 / payload_size) AS max_peak_per_byte, '
+            f'MAX(payload_size) AS largest_payload '
+            f'FROM performance_logs{memory_where} GROUP BY operation',
+            params
+        )
+        statistics['memory_by_operation'] = {
+            row['operation']: {
+                'samples': row['samples'],
+                'max_tracemalloc_peak': row['max_peak'],
+                'average_tracemalloc_peak': row['average_peak'],
+                'max_rss_delta': row['max_rss_delta'],
+                'max_peak_per_payload_byte': row['max_peak_per_byte'],
+                'largest_payload': row['largest_payload'] or 0
+            }
+            for row in rows
+        }
+
+        return statistics
+
+    def clear(self):
+        """Delete all stored entries"""
+        with self._pending_lock:
+            self._pending = []
+        with self._db_lock, self._connection:
+            self._connection.execute('DELETE FROM performance_logs')
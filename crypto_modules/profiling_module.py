@@ -0,0 +1,119 @@
+"""
+Profiling Module for Hybrid ECC-AES192 System
+Handles optional per-operation memory instrumentation
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def read_rss():
+    """
+    Current resident set size of this process in bytes
+    Returns None where /proc is unavailable
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class MemoryMeasurement:
+    """
+    Memory usage of one operation, from MemoryProfiler.start() until
+    snapshot() or finish()
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.concurrent = False
+        self.rss_before = read_rss()
+        self.blocks_before = sys.getallocatedblocks()
+        self.traced_before = tracemalloc.get_traced_memory()[0]
+
+    def snapshot(self):
+        """
+        Finish the measurement
+        Returns: dict with tracemalloc peak, net allocated blocks and RSS
+        delta; 'concurrent' is True when another measurement overlapped
+        this one, so the process-wide values include its allocations
+        """
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        rss_after = read_rss()
+        self.finish()
+        return {
+            'tracemalloc_peak': max(traced_peak - self.traced_before, 0),
+            'tracemalloc_net': traced_current - self.traced_before,
+            'net_allocated_blocks': sys.getallocatedblocks() - self.blocks_before,
+            'rss_before': self.rss_before,
+            'rss_after': rss_after,
+            'rss_delta': rss_after - self.rss_before if rss_after is not None and self.rss_before is not None else None,
+            'concurrent': self.concurrent
+        }
+
+    def finish(self):
+        """Stop counting this measurement as active (idempotent)"""
+        self.profiler._finish(self)
+
+
+class MemoryProfiler:
+    def __init__(self, enabled=False):
+        """
+        Initialize Memory Profiler
+        Args:
+            enabled: Start with instrumentation on
+        Note:
+            tracemalloc is process-wide; the peak is only reset when no other
+            measurement is running, and overlapping measurements are marked
+            concurrent since their values include each other's allocations
+        """
+        self._lock = threading.Lock()
+        self._active = set()
+        self._started_tracing = False
+        self.enabled = False
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        """Turn instrumentation on or off at runtime"""
+        with self._lock:
+            if enabled and not self.enabled:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+            elif not enabled and self.enabled:
+                # Only stop tracing that this profiler started
+                if self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+            self.enabled = bool(enabled)
+
+    def start(self):
+        """
+        Begin measuring an operation
+        Returns: MemoryMeasurement, or None when instrumentation is off
+        """
+        if not self.enabled or not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            if not self._active:
+                # Resetting while another measurement runs would erase its peak
+                tracemalloc.reset_peak()
+            measurement = MemoryMeasurement(self)
+            if self._active:
+                measurement.concurrent = True
+                for other in self._active:
+                    other.concurrent = True
+            self._active.add(measurement)
+        return measurement
+
+    def _finish(self, measurement):
+        with self._lock:
+            self._active.discard(measurement)